@@ -0,0 +1,200 @@
+"""API endpoint benchmark suite
+
+Seeds the app with generated cases, signals, threats and recommendations,
+then times every endpoint in-process through the ASGI app and reports
+p50/p99 latency and throughput. The app's lifespan runs as in production,
+so ingest endpoints also feed the detection pipeline; its backlog is
+drained between endpoints so one endpoint's queued work is not billed to
+the next. Each row count runs in its own process so tiers do not share
+state.
+
+    python -m benchmarks.api_endpoints --rows 10000 100000 1000000
+    python -m benchmarks.api_endpoints --rows 10000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.api_endpoints --rows 10000 --compare benchmarks/baseline.json --tolerance 0.3
+
+With ``--compare`` the run exits non-zero if any endpoint's p50 or p99 is
+more than ``tolerance`` slower than the baseline. Evidence upload/download,
+case deletion, the SSE stream and retention sweeps are left out because
+they mutate or drain the seeded data.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from modules.storage import utc_now
+
+os.environ.setdefault("WHITEKNIGHT_DATABASE_URL", "sqlite://")
+os.environ.setdefault("WHITEKNIGHT_EVIDENCE_ROOT", tempfile.mkdtemp(prefix="whiteknight-bench-evidence-"))
+os.environ.setdefault("WHITEKNIGHT_ARCHIVE_ROOT", tempfile.mkdtemp(prefix="whiteknight-bench-archive-"))
+
+SIGNAL_TYPES = ("ble", "cell", "wifi", "cell_tower")
+THREAT_LEVELS = ("low", "medium", "high", "critical")
+PRIORITIES = ("low", "medium", "high")
+
+
+def seed(main, rows, seed=7):
+    """Fill the app's stores with ``rows`` signals plus proportional cases, threats and recommendations.
+
+    Signals span the last 24 hours over 2000 locations (a third with
+    coordinates) and a Zipf-distributed population of sources, so index
+    buckets and source clusters have realistic skew.
+    """
+    rng = random.Random(seed)
+    cases = []
+    for i in range(max(10, rows // 1000)):
+        case_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        main.cases_db[case_id] = {"case_id": case_id, "title": f"Case {i}", "description": "generated", "investigator": f"inv-{i % 20}", "priority": rng.choice(PRIORITIES), "created_at": utc_now(), "status": "active", "evidence_count": 0, "evidence": [], "threats_detected": 0, "signals_tracked": 0}
+        cases.append(case_id)
+    start = datetime.fromisoformat(utc_now()) - timedelta(hours=24)
+    step = 86400 / max(1, rows)
+    signals = []
+    for offset in range(0, rows, 1000):
+        case_id = rng.choice(cases)
+        batch = []
+        for i in range(offset, min(rows, offset + 1000)):
+            site = rng.randrange(2000)
+            located = site % 3 == 0
+            payload = main.ThreatSignal(signal_type=rng.choice(SIGNAL_TYPES), location=f"site-{site}", strength=rng.randint(-110, -30), source_id=f"dev-{min(int(rng.paretovariate(0.6)), 50000)}", timestamp=(start + timedelta(seconds=i * step)).isoformat(), latitude=40.0 + site / 1000 if located else None, longitude=-74.0 + site / 1000 if located else None)
+            batch.append(main.build_signal_entry(payload, case_id, payload.timestamp))
+        main.store_signals(batch, case_id)
+        signals.extend(signal["signal_id"] for signal in batch)
+    threats = []
+    for signal_id in rng.sample(signals, max(1, rows // 10)):
+        signal = main.signals_db[signal_id]
+        threats.append(main.create_threat(signal, rng.choice(THREAT_LEVELS), signal["case_id"])["threat_id"])
+    for threat_id in threats[: len(threats) // 2]:
+        main.create_recommendation(main.threats_db[threat_id])
+    return {"cases": cases, "signals": signals, "threats": threats, "sources": [main.signals_db[signal_id]["source_id"] for signal_id in signals[:1000]]}
+
+
+def scenarios(data, rng):
+    """Map endpoint names to callables returning ``(method, url, json)`` for the next request."""
+    pick = rng.choice
+    new_signal = lambda: {"signal_type": pick(SIGNAL_TYPES), "location": f"site-{rng.randrange(2000)}", "strength": rng.randint(-110, -30), "source_id": f"dev-{rng.randrange(500)}"}
+    return {
+        "GET /health": lambda: ("GET", "/health", None),
+        "GET /api/info": lambda: ("GET", "/api/info", None),
+        "GET /api/cases": lambda: ("GET", "/api/cases?limit=100&include_evidence=false", None),
+        "GET /api/cases/{id}": lambda: ("GET", f"/api/cases/{pick(data['cases'])}", None),
+        "POST /api/case": lambda: ("POST", "/api/case", {"title": "Bench", "description": "benchmark", "investigator": "bench", "priority": "low"}),
+        "PUT /api/cases/{id}": lambda: ("PUT", f"/api/cases/{pick(data['cases'])}", {"title": "Bench", "description": "updated", "investigator": "bench", "priority": pick(PRIORITIES)}),
+        "GET /api/signals": lambda: ("GET", "/api/signals?limit=100", None),
+        "GET /api/signals?signal_type&case_id": lambda: ("GET", f"/api/signals?signal_type={pick(SIGNAL_TYPES)}&case_id={pick(data['cases'])}&limit=100", None),
+        "GET /api/signals/{id}": lambda: ("GET", f"/api/signals/{pick(data['signals'])}", None),
+        "GET /api/signals/search": lambda: ("GET", f"/api/signals/search?lat={40.0 + rng.random() * 2:.4f}&lon={-74.0 + rng.random() * 2:.4f}&radius_km=5&limit=100", None),
+        "POST /api/signal": lambda: ("POST", "/api/signal", new_signal()),
+        "POST /api/signals/bulk": lambda: ("POST", "/api/signals/bulk", [new_signal() for _ in range(100)]),
+        "POST /api/threat": lambda: ("POST", f"/api/threat?signal_id={pick(data['signals'])}&threat_level={pick(THREAT_LEVELS)}", None),
+        "POST /api/threat (scored)": lambda: ("POST", f"/api/threat?signal_id={pick(data['signals'])}", None),
+        "GET /api/threats": lambda: ("GET", f"/api/threats?threat_level={pick(THREAT_LEVELS)}&limit=100", None),
+        "GET /api/threats/{id}": lambda: ("GET", f"/api/threats/{pick(data['threats'])}", None),
+        "GET /api/sources/{id}": lambda: ("GET", f"/api/sources/{pick(data['sources'])}", None),
+        "POST /api/ai/recommend": lambda: ("POST", f"/api/ai/recommend?threat_id={pick(data['threats'])}", None),
+        "POST /api/ai/recommend/bulk": lambda: ("POST", "/api/ai/recommend/bulk", {"threat_ids": rng.sample(data["threats"], min(50, len(data["threats"])))}),
+        "GET /api/ai/recommendations": lambda: ("GET", "/api/ai/recommendations?limit=100", None),
+        "GET /api/dashboard": lambda: ("GET", f"/api/dashboard?case_id={pick(data['cases'])}", None),
+        "GET /api/trends": lambda: ("GET", "/api/trends", None),
+        "GET /api/pipeline": lambda: ("GET", "/api/pipeline", None),
+        "GET /metrics": lambda: ("GET", "/metrics", None),
+    }
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def measure(client, next_request, requests, warmup):
+    latencies = []
+    for i in range(warmup + requests):
+        method, url, body = next_request()
+        start = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        if i >= warmup:
+            latencies.append(elapsed)
+    latencies.sort()
+    return {"p50_ms": percentile(latencies, 0.50) * 1000, "p99_ms": percentile(latencies, 0.99) * 1000, "rps": len(latencies) / sum(latencies)}
+
+
+async def run_tier(rows, requests, warmup):
+    import httpx
+
+    from src import main
+
+    started = time.perf_counter()
+    data = seed(main, rows)
+    seeded = time.perf_counter() - started
+    rng = random.Random(11)
+    results = {}
+    async with main.app.router.lifespan_context(main.app), httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        for name, next_request in scenarios(data, rng).items():
+            results[name] = await measure(client, next_request, requests, warmup)
+            await main.pipeline.drain()
+    return {"rows": rows, "seed_seconds": seeded, "endpoints": results}
+
+
+def compare(results, baseline, tolerance, floor_ms=0.05):
+    """Return regressions where p50 or p99 grew by more than ``tolerance`` (and ``floor_ms``) over the baseline."""
+    regressions = []
+    for rows, tier in results.items():
+        for name, current in tier["endpoints"].items():
+            previous = baseline.get(rows, {}).get("endpoints", {}).get(name)
+            if previous is None:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if current[metric] > previous[metric] * (1 + tolerance) and current[metric] - previous[metric] > floor_ms:
+                    regressions.append(f"{rows} rows {name}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f}")
+    return regressions
+
+
+def report(tier):
+    print(f"\n{tier['rows']:,} rows (seeded in {tier['seed_seconds']:.1f}s)")
+    print(f"{'endpoint':<40}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, stats in tier["endpoints"].items():
+        print(f"{name:<40}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['rps']:>10,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown before --compare fails")
+    parser.add_argument("--tier", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.tier is not None:
+        print(json.dumps(asyncio.run(run_tier(args.tier, args.requests, args.warmup))))
+        return
+    results = {}
+    for rows in args.rows:
+        output = subprocess.run([sys.executable, "-m", "benchmarks.api_endpoints", "--tier", str(rows), "--requests", str(args.requests), "--warmup", str(args.warmup)], check=True, capture_output=True, text=True).stdout
+        results[str(rows)] = json.loads(output.strip().splitlines()[-1])
+        report(results[str(rows)])
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nbaseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            print("\n".join(f"  {line}" for line in regressions))
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
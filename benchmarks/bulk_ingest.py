@@ -0,0 +1,65 @@
+"""Bulk ingest benchmark
+
+Compares POST /api/signal (one request per signal) with POST /api/signals/bulk
+(JSON array and NDJSON) in-process through the ASGI app.
+
+    python -m benchmarks.bulk_ingest --signals 20000 --batch-size 1000
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("WHITEKNIGHT_DATABASE_URL", "sqlite://")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.main import app  # noqa: E402
+
+SIGNAL_TYPES = ("ble", "cell", "wifi", "cell_tower")
+
+
+def make_signals(count):
+    return [{"signal_type": SIGNAL_TYPES[i % 4], "location": f"site-{i % 50}", "strength": -30 - i % 60, "source_id": f"dev-{i % 500}"} for i in range(count)]
+
+
+def bench_single(client, signals):
+    start = time.perf_counter()
+    for signal in signals:
+        client.post("/api/signal", json=signal)
+    return time.perf_counter() - start
+
+
+def bench_bulk_json(client, signals, batch_size):
+    start = time.perf_counter()
+    for offset in range(0, len(signals), batch_size * 10):
+        client.post(f"/api/signals/bulk?batch_size={batch_size}", json=signals[offset:offset + batch_size * 10])
+    return time.perf_counter() - start
+
+
+def bench_bulk_ndjson(client, signals, batch_size):
+    body = "\n".join(json.dumps(signal) for signal in signals).encode()
+    start = time.perf_counter()
+    client.post(f"/api/signals/bulk?batch_size={batch_size}", content=body, headers={"content-type": "application/x-ndjson"})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=20000)
+    parser.add_argument("--single", type=int, default=2000, help="signals sent through the single-signal path")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    signals = make_signals(args.signals)
+    with TestClient(app) as client:
+        results = {
+            "single": (args.single, bench_single(client, signals[:args.single])),
+            "bulk_json": (args.signals, bench_bulk_json(client, signals, args.batch_size)),
+            "bulk_ndjson": (args.signals, bench_bulk_ndjson(client, signals, args.batch_size)),
+        }
+    for name, (count, elapsed) in results.items():
+        print(f"{name:<12} {count:>8} signals {elapsed:8.3f}s {count / elapsed:>10.0f} signals/s")
+
+
+if __name__ == "__main__":
+    main()
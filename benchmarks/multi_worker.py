@@ -0,0 +1,102 @@
+"""Multi-worker load test
+
+Starts the API under uvicorn with 1, 2, ... workers sharing one SQLite file,
+drives it with concurrent bulk ingest and read requests, and reports
+throughput per worker count. Afterwards it checks that every worker's
+dashboard agrees on the number of ingested signals.
+
+Shared mode scales reads, not ingest. Each worker answers reads from its
+own in-memory view, so read throughput grows with workers up to the
+number of cores, but every worker also replays every committed change
+into that view, so signals/s stays near what one worker can replay. A
+worker may serve another worker's writes up to ``sync_interval_ms`` late;
+counters are always incremented in SQL, so none are lost.
+
+    python -m benchmarks.multi_worker --workers 1 2 4 --seconds 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SIGNAL_TYPES = ("ble", "cell", "wifi", "cell_tower")
+
+
+def start_server(workers, port, workdir):
+    env = dict(os.environ, WHITEKNIGHT_DATABASE_URL=f"sqlite:///{workdir}/fortress.db", WHITEKNIGHT_WORKERS=str(workers), WHITEKNIGHT_EVIDENCE_ROOT=f"{workdir}/evidence", WHITEKNIGHT_ARCHIVE_ROOT=f"{workdir}/archive")
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"], env=env)
+
+
+async def wait_ready(client, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def drive(client, deadline, batch, read_ratio, counters, rng):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        if rng.random() < read_ratio:
+            response = await client.get(rng.choice(("/api/signals?limit=100", "/api/dashboard", "/api/threats?limit=100")))
+            kind = "reads"
+        else:
+            signals = [{"signal_type": rng.choice(SIGNAL_TYPES), "location": f"site-{rng.randrange(500)}", "strength": rng.randint(-110, -30), "source_id": f"dev-{rng.randrange(5000)}"} for _ in range(batch)]
+            response = await client.post("/api/signals/bulk", json=signals)
+            kind = "writes"
+            counters["signals"] += response.json().get("accepted", 0) if response.status_code == 200 else 0
+        counters[kind] += 1
+        counters["errors"] += response.status_code >= 400
+        counters["latency"].append(time.perf_counter() - start)
+
+
+async def run(workers, args):
+    port = args.port + workers
+    with tempfile.TemporaryDirectory(prefix="whiteknight-load-") as workdir:
+        server = start_server(workers, port, workdir)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=0)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0, limits=limits) as client:
+                await wait_ready(client)
+                counters = {"reads": 0, "writes": 0, "signals": 0, "errors": 0, "latency": []}
+                deadline = time.monotonic() + args.seconds
+                await asyncio.gather(*(drive(client, deadline, args.batch, args.read_ratio, counters, random.Random(i)) for i in range(args.concurrency)))
+                await asyncio.sleep(1.0)
+                totals = {(await client.get("/api/dashboard")).json()["dashboard"]["real_time_status"]["total_signals_detected"] for _ in range(workers * 4)}
+        finally:
+            server.terminate()
+            server.wait()
+    latency = sorted(counters["latency"])
+    requests = counters["reads"] + counters["writes"]
+    p99 = latency[int(len(latency) * 0.99)] * 1000 if latency else 0.0
+    consistent = "yes" if totals == {counters["signals"]} else f"no {sorted(totals)}"
+    print(f"{workers:>7} {requests / args.seconds:>10,.0f} {counters['reads'] / args.seconds:>10,.0f} {counters['signals'] / args.seconds:>12,.0f} {p99:>9.1f} {counters['errors']:>7} {consistent:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=100, help="signals per bulk request")
+    parser.add_argument("--read-ratio", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    print(f"{'workers':>7} {'req/s':>10} {'reads/s':>10} {'signals/s':>12} {'p99 ms':>9} {'errors':>7} {'consistent':>12}")
+    for workers in args.workers:
+        asyncio.run(run(workers, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Signal memory benchmark
+
+Measures bytes per stored signal for plain dicts versus SignalRecord, both
+for the records alone and inside an IndexedStore with the API's indexes.
+
+    python -m benchmarks.signal_memory --signals 100000
+"""
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from modules.storage import IndexedStore, SignalRecord
+
+SIGNAL_TYPES = ("ble", "cell", "wifi", "cell_tower")
+INDEXES = ("signal_type", "case_id", "location", "source_id")
+
+
+def make_payloads(count, locations=2000, sources=20000, cases=50, seed=7):
+    """Yield signal dicts whose strings are fresh objects, as if each came from its own request body."""
+    rng = random.Random(seed)
+    case_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(cases)]
+    start = datetime(2026, 1, 1)
+    for _ in range(count):
+        yield json.loads(json.dumps({
+            "signal_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "signal_type": rng.choice(SIGNAL_TYPES),
+            "location": f"site-{rng.randrange(locations)}",
+            "strength": rng.randint(-110, -30),
+            "source_id": f"dev-{rng.randrange(sources)}",
+            "timestamp": (start + timedelta(microseconds=rng.randrange(86400 * 10 ** 6))).isoformat(),
+            "case_id": rng.choice(case_ids),
+            "latitude": None,
+            "longitude": None,
+            "fingerprint": None,
+        }))
+
+
+def measure(count, build, store):
+    gc.collect()
+    tracemalloc.start()
+    records = IndexedStore("signal_id", indexes=INDEXES) if store else {}
+    for payload in make_payloads(count):
+        record = build(payload)
+        records[record["signal_id"]] = record
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=100_000)
+    args = parser.parse_args()
+    print(f"{'representation':<16}{'records only':>20}{'indexed store':>20}")
+    for name, build in (("dict", dict), ("SignalRecord", SignalRecord)):
+        print(f"{name:<16}{measure(args.signals, build, False):>11.0f} B/signal{measure(args.signals, build, True):>11.0f} B/signal")
+
+
+if __name__ == "__main__":
+    main()
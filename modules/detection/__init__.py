@@ -0,0 +1,5 @@
+"""Detection"""
+from modules.detection.pipeline import LEVEL_RANK, DetectionPipeline
+from modules.detection.source_clusters import SourceClusters
+
+__all__ = ["LEVEL_RANK", "DetectionPipeline", "SourceClusters"]
@@ -0,0 +1,124 @@
+"""Streaming detection pipeline"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEVEL_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+class DetectionPipeline:
+    """Bounded asyncio queue between signal ingest and the threat detector.
+
+    Handlers ``submit`` signals; a single worker drains the queue in
+    micro-batches of up to ``batch_size`` signals (waiting at most ``linger``
+    seconds to fill one), scores each batch with ``detector`` in a worker
+    thread, and calls ``on_threat(signal, level)`` for every signal scored at
+    ``min_level`` or above; ``on_threat`` returns ``False`` when it folded the
+    detection into an existing threat. A full queue makes ``submit`` wait,
+    which is the backpressure applied to ingest.
+    """
+
+    def __init__(self, detector: Any, context: Callable[[List[dict]], Iterable[dict]], on_threat: Callable[[dict, str], Any], max_queue: int = 10000, batch_size: int = 500, linger: float = 0.05, min_level: str = "high"):
+        self.detector = detector
+        self.context = context
+        self.on_threat = on_threat
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.linger = linger
+        self.min_rank = LEVEL_RANK[min_level]
+        self._queue: Optional["asyncio.Queue[Tuple[float, dict]]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.processed = 0
+        self.batches = 0
+        self.threats_created = 0
+        self.threats_merged = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any], detector: Any, context: Callable[[List[dict]], Iterable[dict]], on_threat: Callable[[dict, str], Any]) -> "DetectionPipeline":
+        return cls(detector, context, on_threat, max_queue=settings.get("max_queue", 10000), batch_size=settings.get("batch_size", 500), linger=settings.get("linger_ms", 50) / 1000, min_level=settings.get("min_threat_level", "high"))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Drain queued signals, then stop the worker."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, signal: dict) -> None:
+        """Queue a signal for detection; no-op while the pipeline is stopped."""
+        if self.running:
+            await self._queue.put((time.monotonic(), signal))
+
+    async def submit_many(self, signals: Iterable[dict]) -> None:
+        for signal in signals:
+            await self.submit(signal)
+
+    async def drain(self) -> None:
+        """Wait until every queued signal has been scored."""
+        if self.running:
+            await self._queue.join()
+
+    async def _next_batch(self) -> List[Tuple[float, dict]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.linger
+        while len(batch) < self.batch_size:
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            await asyncio.sleep(remaining)
+            deadline = loop.time()
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                signals = [signal for _, signal in batch]
+                context = list(self.context(signals))
+                levels = await loop.run_in_executor(None, self.detector.classify, context, [signal["signal_id"] for signal in signals])
+                for signal, level in zip(signals, levels):
+                    if LEVEL_RANK.get(level, 0) >= self.min_rank:
+                        if self.on_threat(signal, level) is False:
+                            self.threats_merged += 1
+                        else:
+                            self.threats_created += 1
+                self.processed += len(batch)
+                self.batches += 1
+                self.last_batch_size = len(batch)
+                self.last_lag = time.monotonic() - batch[0][0]
+                self.max_lag = max(self.max_lag, self.last_lag)
+            except Exception:
+                self.errors += 1
+                logger.exception("Detection failed for a batch of %d signals", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"running": self.running, "queue_depth": self._queue.qsize() if self._queue is not None else 0, "max_queue": self.max_queue, "batch_size": self.batch_size, "linger_ms": self.linger * 1000, "processed": self.processed, "batches": self.batches, "threats_created": self.threats_created, "threats_merged": self.threats_merged, "errors": self.errors, "last_batch_size": self.last_batch_size, "lag_seconds": round(self.last_lag, 6), "max_lag_seconds": round(self.max_lag, 6)}
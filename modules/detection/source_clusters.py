@@ -0,0 +1,153 @@
+"""Incremental source clustering"""
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+
+class _Cluster:
+    __slots__ = ("sources", "cases", "signal_types", "signal_count", "first_seen", "last_seen", "links")
+
+    def __init__(self, source_id: str):
+        self.sources: Set[str] = {source_id}
+        self.cases: Set[str] = set()
+        self.signal_types: Set[str] = set()
+        self.signal_count = 0
+        self.first_seen: Optional[int] = None
+        self.last_seen: Optional[int] = None
+        self.links = {"fingerprint": 0, "co_occurrence": 0}
+
+    def absorb(self, other: "_Cluster") -> None:
+        self.sources |= other.sources
+        self.cases |= other.cases
+        self.signal_types |= other.signal_types
+        self.signal_count += other.signal_count
+        seen = [t for t in (self.first_seen, other.first_seen) if t is not None]
+        self.first_seen = min(seen) if seen else None
+        seen = [t for t in (self.last_seen, other.last_seen) if t is not None]
+        self.last_seen = max(seen) if seen else None
+        for reason, count in other.links.items():
+            self.links[reason] += count
+
+
+class SourceClusters:
+    """Online union-find of signal sources that are likely the same device or operator.
+
+    Sources are merged when they share a fingerprint (same signal type and
+    hardware fingerprint) or when they are seen together at the same place
+    within ``window_ms`` at least ``co_occurrence_threshold`` times. A pair
+    counts at most once per window, so a burst of pings next to a bystander
+    is a single co-occurrence. Each observation touches at most
+    ``max_recent`` recent sightings of its place, so the cost per signal
+    stays near-constant as data grows.
+
+    A pair below the threshold starts over when its next co-occurrence is
+    more than ``pair_ttl_ms`` away from the last one it counted, and at most
+    ``max_pairs`` are tracked, evicting the least recently counted first.
+    Staleness is judged between a pair's own observations, so a stray
+    far-future or backfilled timestamp does not age out everyone else.
+    """
+
+    def __init__(self, window_ms: int = 300000, co_occurrence_threshold: int = 3, max_recent: int = 32, pair_ttl_ms: int = 86400000, max_pairs: int = 100000):
+        self.window_ms = window_ms
+        self.co_occurrence_threshold = co_occurrence_threshold
+        self.max_recent = max_recent
+        self.pair_ttl_ms = pair_ttl_ms
+        self.max_pairs = max_pairs
+        self._parent: Dict[str, str] = {}
+        self._clusters: Dict[str, _Cluster] = {}
+        self._fingerprints: Dict[Tuple[str, str], str] = {}
+        self._recent: Dict[str, Deque[Tuple[int, str]]] = {}
+        self._pairs: "OrderedDict[Tuple[str, str], Tuple[int, int]]" = OrderedDict()
+        self._cross_case: Set[str] = set()
+
+    def __contains__(self, source_id: object) -> bool:
+        return source_id in self._parent
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def find(self, source_id: str) -> str:
+        root = source_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[source_id] != root:
+            self._parent[source_id], source_id = root, self._parent[source_id]
+        return root
+
+    def _ensure(self, source_id: str) -> str:
+        if source_id not in self._parent:
+            self._parent[source_id] = source_id
+            self._clusters[source_id] = _Cluster(source_id)
+            return source_id
+        return self.find(source_id)
+
+    def union(self, a: str, b: str, reason: str) -> str:
+        root_a, root_b = self._ensure(a), self._ensure(b)
+        if root_a == root_b:
+            return root_a
+        if len(self._clusters[root_a].sources) < len(self._clusters[root_b].sources):
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        cluster = self._clusters[root_a]
+        cluster.absorb(self._clusters.pop(root_b))
+        cluster.links[reason] += 1
+        self._cross_case.discard(root_b)
+        if len(cluster.cases) > 1:
+            self._cross_case.add(root_a)
+        return root_a
+
+    def observe(self, source_id: str, signal_type: str, place: Optional[str], epoch_ms: int, case_id: Optional[str] = None, fingerprint: Optional[str] = None) -> str:
+        """Fold one signal into the clusters and return its cluster id."""
+        root = self._ensure(source_id)
+        cluster = self._clusters[root]
+        cluster.signal_count += 1
+        cluster.signal_types.add(signal_type)
+        if case_id and case_id not in cluster.cases:
+            cluster.cases.add(case_id)
+            if len(cluster.cases) > 1:
+                self._cross_case.add(root)
+        cluster.first_seen = epoch_ms if cluster.first_seen is None else min(cluster.first_seen, epoch_ms)
+        cluster.last_seen = epoch_ms if cluster.last_seen is None else max(cluster.last_seen, epoch_ms)
+        if fingerprint:
+            owner = self._fingerprints.setdefault((signal_type, fingerprint), source_id)
+            if owner != source_id:
+                self.union(owner, source_id, "fingerprint")
+        if place:
+            self._co_occur(source_id, place, epoch_ms)
+        return self.find(source_id)
+
+    def _co_occur(self, source_id: str, place: str, epoch_ms: int) -> None:
+        recent = self._recent.get(place)
+        if recent is None:
+            recent = self._recent[place] = deque(maxlen=self.max_recent)
+        root = self.find(source_id)
+        others = {other for seen_at, other in recent if other != source_id and abs(epoch_ms - seen_at) <= self.window_ms and self.find(other) != root}
+        recent.append((epoch_ms, source_id))
+        for other in others:
+            pair = (source_id, other) if source_id < other else (other, source_id)
+            count, counted_at = self._pairs.get(pair, (0, None))
+            if counted_at is not None:
+                gap = abs(epoch_ms - counted_at)
+                if gap <= self.window_ms:
+                    continue
+                if gap > self.pair_ttl_ms:
+                    count = 0
+            if count + 1 >= self.co_occurrence_threshold:
+                self._pairs.pop(pair, None)
+                self.union(source_id, other, "co_occurrence")
+                continue
+            self._pairs[pair] = (count + 1, epoch_ms)
+            self._pairs.move_to_end(pair)
+            if len(self._pairs) > self.max_pairs:
+                self._pairs.popitem(last=False)
+
+    def cluster(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """Describe the cluster containing ``source_id``, or ``None`` if it was never seen."""
+        if source_id not in self._parent:
+            return None
+        root = self.find(source_id)
+        cluster = self._clusters[root]
+        return {"cluster_id": root, "sources": sorted(cluster.sources), "linked_cases": sorted(cluster.cases), "signal_count": cluster.signal_count, "signal_types": sorted(cluster.signal_types), "first_seen_ms": cluster.first_seen, "last_seen_ms": cluster.last_seen, "links": dict(cluster.links)}
+
+    def cross_case(self) -> List[Dict[str, Any]]:
+        """Clusters that link more than one case, tracked as merges happen rather than by scanning."""
+        return [self.cluster(root) for root in sorted(self._cross_case)]
@@ -0,0 +1,5 @@
+"""Monitoring"""
+from modules.monitoring.metrics import Histogram, MetricsMiddleware, RequestMetrics
+from modules.monitoring.profiler import SamplingProfiler
+
+__all__ = ["Histogram", "MetricsMiddleware", "RequestMetrics", "SamplingProfiler"]
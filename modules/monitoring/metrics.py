@@ -0,0 +1,193 @@
+"""Request metrics"""
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+UNMATCHED = "unmatched"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}" if labels else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``counts[i]`` holds observations in ``(bounds[i-1], bounds[i]]``, the last slot the overflow."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket, like PromQL's ``histogram_quantile``."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def render(self, name: str, labels: Dict[str, Any]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}")
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+class RequestMetrics:
+    """Per-route request latency, payload sizes and response counts, plus gauges read at scrape time.
+
+    Routes are labelled by their path template (``/api/cases/{case_id}``),
+    never the raw path, so label cardinality is bounded by the app's routes.
+    Gauges are callables registered with :meth:`register` and are only
+    evaluated by :meth:`render`, so nothing is tracked on the hot path for
+    them.
+    """
+
+    def __init__(self, namespace: str = "whiteknight"):
+        self.namespace = namespace
+        self.started = time.time()
+        self.in_flight = 0
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_bytes: Dict[Tuple[str, str], Histogram] = {}
+        self.response_bytes: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        self.collectors: Dict[str, Tuple[str, str, Optional[str], Callable[[], Any]]] = {}
+
+    def register(self, name: str, help_text: str, read: Callable[[], Any], kind: str = "gauge", label: Optional[str] = None) -> None:
+        """Expose ``read()`` as ``<namespace>_<name>``; with ``label`` it returns a mapping of label value to number."""
+        self.collectors[f"{self.namespace}_{name}"] = (help_text, kind, label, read)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, received: int, sent: int) -> None:
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_bytes[key] = Histogram(SIZE_BUCKETS)
+            self.response_bytes[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.request_bytes[key].observe(received)
+        self.response_bytes[key].observe(sent)
+        response_key = (method, route, status)
+        self.responses[response_key] = self.responses.get(response_key, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals across every route, for health checks and the dashboard."""
+        overall = Histogram(LATENCY_BUCKETS)
+        for histogram in self.latency.values():
+            overall.merge(histogram)
+        errors = sum(count for (_, _, status), count in self.responses.items() if status >= 500)
+        return {"uptime_seconds": round(time.time() - self.started, 3), "requests": overall.count, "errors": errors, "in_flight": self.in_flight, "p50_ms": round(overall.quantile(0.5) * 1000, 3), "p99_ms": round(overall.quantile(0.99) * 1000, 3)}
+
+    def _histograms(self, name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> Iterable[str]:
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} histogram"
+        for (method, route), histogram in sorted(histograms.items()):
+            yield from histogram.render(name, {"method": method, "route": route})
+
+    def render(self) -> str:
+        """Everything in the Prometheus text exposition format (version 0.0.4)."""
+        ns = self.namespace
+        lines = [f"# HELP {ns}_process_start_time_seconds Start time of the process since the Unix epoch.", f"# TYPE {ns}_process_start_time_seconds gauge", f"{ns}_process_start_time_seconds {_number(self.started)}"]
+        lines += [f"# HELP {ns}_http_requests_in_flight Requests currently being served.", f"# TYPE {ns}_http_requests_in_flight gauge", f"{ns}_http_requests_in_flight {self.in_flight}"]
+        lines += [f"# HELP {ns}_http_responses_total Responses sent, by route and status code.", f"# TYPE {ns}_http_responses_total counter"]
+        lines += [f"{ns}_http_responses_total{_labels({'method': method, 'route': route, 'status': status})} {count}" for (method, route, status), count in sorted(self.responses.items())]
+        lines += self._histograms(f"{ns}_http_request_duration_seconds", "Time from receiving a request to sending the last response byte.", self.latency)
+        lines += self._histograms(f"{ns}_http_request_size_bytes", "Request body size.", self.request_bytes)
+        lines += self._histograms(f"{ns}_http_response_size_bytes", "Response body size.", self.response_bytes)
+        for name, (help_text, kind, label, read) in self.collectors.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            value = read()
+            if label is None:
+                lines.append(f"{name} {_number(value)}")
+            else:
+                lines += [f"{name}{_labels({label: key})} {_number(item)}" for key, item in value.items()]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding every HTTP request into a :class:`RequestMetrics`.
+
+    Body sizes are counted from the ASGI messages, so chunked uploads and
+    streamed responses are measured as sent. Requests that match none of
+    ``routes`` share the ``unmatched`` label.
+    """
+
+    def __init__(self, app: Callable, metrics: RequestMetrics, routes: Sequence[Any] = ()):
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+
+    def route_of(self, scope: Dict[str, Any]) -> str:
+        route = scope.get("route")
+        if route is None:
+            route = next((candidate for candidate in self.routes if candidate.matches(scope)[0] is Match.FULL), None)
+        return getattr(route, "path", None) or UNMATCHED
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        received = sent = 0
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], self.route_of(scope), status, time.perf_counter() - start, received, sent)
@@ -0,0 +1,100 @@
+"""Sampling profiler"""
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class SamplingProfiler:
+    """Periodically samples thread stacks from a background thread.
+
+    Stacks are counted in collapsed form (``outer;inner``), the input format
+    of flame graph tools. By default only the main thread, which runs the
+    event loop, is sampled; ``all_threads`` adds executor threads. Nothing
+    runs while the profiler is stopped, so it can stay wired in production
+    and be switched on when needed. At most ``max_stacks`` distinct stacks
+    are kept; samples of further stacks are only counted as dropped.
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64, max_stacks: int = 10000, all_threads: bool = False):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.all_threads = all_threads
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: Optional[float] = None, all_threads: Optional[bool] = None) -> None:
+        """Start sampling from a clean slate; a running profiler is restarted with the new settings."""
+        self.stop()
+        if interval is not None:
+            self.interval = interval
+        if all_threads is not None:
+            self.all_threads = all_threads
+        self.reset()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stacks = {}
+            self.samples = 0
+            self.dropped = 0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _collapse(self, frame: Any) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def sample(self) -> None:
+        """Record the current stack of every sampled thread once."""
+        frames = sys._current_frames()
+        if self.all_threads:
+            own = threading.get_ident()
+            frames = [frame for ident, frame in frames.items() if ident != own]
+        else:
+            frames = [frames[threading.main_thread().ident]]
+        stacks = [self._collapse(frame) for frame in frames]
+        with self._lock:
+            for stack in stacks:
+                if stack in self.stacks:
+                    self.stacks[stack] += 1
+                elif len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] = 1
+                else:
+                    self.dropped += 1
+            self.samples += 1
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            ranked = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{"stack": stack, "samples": count} for stack, count in ranked]
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self.running, "interval_ms": self.interval * 1000, "all_threads": self.all_threads, "samples": self.samples, "stacks": len(self.stacks), "dropped": self.dropped}
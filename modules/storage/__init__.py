@@ -0,0 +1,10 @@
+"""Storage"""
+from modules.storage.aggregates import DashboardAggregates
+from modules.storage.evidence_store import EvidenceStore, StoredArtifact
+from modules.storage.indexed_store import IndexedStore
+from modules.storage.records import CompactRecord, SignalRecord, ThreatRecord
+from modules.storage.retention import RetentionPolicy
+from modules.storage.spatial_index import SpatioTemporalIndex, geohash_encode, parse_coordinates, parse_epoch_ms, to_utc, utc_now
+from modules.storage.sqlite_backend import SQLiteBackend, open_backend
+
+__all__ = ["CompactRecord", "DashboardAggregates", "EvidenceStore", "IndexedStore", "RetentionPolicy", "SQLiteBackend", "SignalRecord", "SpatioTemporalIndex", "StoredArtifact", "ThreatRecord", "geohash_encode", "open_backend", "parse_coordinates", "parse_epoch_ms", "to_utc", "utc_now"]
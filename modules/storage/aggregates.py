@@ -0,0 +1,118 @@
+"""Dashboard aggregates"""
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Optional
+
+THREAT_LEVELS = ("critical", "high", "medium", "low")
+
+
+def _empty_rollup() -> Dict[str, Any]:
+    return {"signals": 0, "threats": 0, "mitigated": 0, "by_level": dict.fromkeys(THREAT_LEVELS, 0), "by_type": {}}
+
+
+def _drop(counts: Dict[str, int], key: str) -> None:
+    counts[key] -= 1
+    if not counts[key] and key not in THREAT_LEVELS:
+        del counts[key]
+
+
+class DashboardAggregates:
+    """Counters kept up to date by the API handlers so the dashboard never scans the stores.
+
+    Every ``record_*`` and ``forget_*`` call is O(1); ``snapshot`` only
+    touches the bounded recent-signal buffer and the first few active
+    threats. The counters cover the rows currently held, so they can be
+    rebuilt from storage after a restart; rows swept by retention are only
+    counted in the retention rollups.
+    """
+
+    def __init__(self, recent_size: int = 5):
+        self.recent_size = recent_size
+        self.total_signals = 0
+        self.signals_by_type: Dict[str, int] = {}
+        self.recent_signals = deque(maxlen=recent_size)
+        self.total_threats = 0
+        self.threats_by_level = dict.fromkeys(THREAT_LEVELS, 0)
+        self.mitigated = 0
+        self.active_threats: Dict[str, dict] = {}
+        self.cases: Dict[str, Dict[str, Any]] = {}
+
+    def _rollup(self, case_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not case_id:
+            return None
+        return self.cases.setdefault(case_id, _empty_rollup())
+
+    def record_signal(self, signal: dict) -> None:
+        sig_type = signal["signal_type"]
+        self.total_signals += 1
+        self.signals_by_type[sig_type] = self.signals_by_type.get(sig_type, 0) + 1
+        self.recent_signals.append(signal)
+        rollup = self._rollup(signal.get("case_id"))
+        if rollup is not None:
+            rollup["signals"] += 1
+            rollup["by_type"][sig_type] = rollup["by_type"].get(sig_type, 0) + 1
+
+    def record_threat(self, threat: dict) -> None:
+        level = threat["threat_level"]
+        self.total_threats += 1
+        self.threats_by_level[level] = self.threats_by_level.get(level, 0) + 1
+        if threat.get("mitigation_applied"):
+            self.mitigated += 1
+        else:
+            self.active_threats[threat["threat_id"]] = threat
+        rollup = self._rollup(threat.get("case_id"))
+        if rollup is not None:
+            rollup["threats"] += 1
+            rollup["by_level"][level] = rollup["by_level"].get(level, 0) + 1
+            if threat.get("mitigation_applied"):
+                rollup["mitigated"] += 1
+
+    def forget_signal(self, signal: dict) -> None:
+        sig_type = signal["signal_type"]
+        self.total_signals -= 1
+        _drop(self.signals_by_type, sig_type)
+        if signal in self.recent_signals:
+            self.recent_signals.remove(signal)
+        rollup = self.cases.get(signal.get("case_id"))
+        if rollup is not None:
+            rollup["signals"] -= 1
+            _drop(rollup["by_type"], sig_type)
+
+    def forget_threat(self, threat: dict) -> None:
+        level = threat["threat_level"]
+        active = self.active_threats.pop(threat["threat_id"], None) is not None
+        self.total_threats -= 1
+        self.threats_by_level[level] -= 1
+        self.mitigated -= not active
+        rollup = self.cases.get(threat.get("case_id"))
+        if rollup is not None:
+            rollup["threats"] -= 1
+            _drop(rollup["by_level"], level)
+            rollup["mitigated"] -= not active
+
+    def record_mitigation(self, threat: dict) -> None:
+        """Move a threat from active to mitigated; repeated calls are no-ops."""
+        if self.active_threats.pop(threat["threat_id"], None) is None:
+            return
+        self.mitigated += 1
+        case_id = threat.get("case_id")
+        if case_id in self.cases:
+            self.cases[case_id]["mitigated"] += 1
+
+    def drop_case(self, case_id: str) -> None:
+        self.cases.pop(case_id, None)
+
+    def case_rollup(self, case_id: str) -> Dict[str, Any]:
+        return self.cases.get(case_id) or _empty_rollup()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the dashboard sections derived from the running counters."""
+        threat_levels = {level: self.threats_by_level.get(level, 0) for level in THREAT_LEVELS}
+        signal_breakdown = dict(self.signals_by_type)
+        return {
+            "real_time_status": {"total_signals_detected": self.total_signals, "total_threats": self.total_threats, "active_threats": self.total_threats - self.mitigated, "mitigated_threats": self.mitigated},
+            "threat_analysis": {"by_level": threat_levels, "critical_count": threat_levels["critical"], "high_count": threat_levels["high"]},
+            "signal_landscape": {"by_type": signal_breakdown, "ble_signals": signal_breakdown.get("ble", 0), "cell_signals": signal_breakdown.get("cell", 0), "wifi_signals": signal_breakdown.get("wifi", 0), "cell_tower_signals": signal_breakdown.get("cell_tower", 0)},
+            "recent_signals": [dict(signal) for signal in self.recent_signals],
+            "active_threats": [dict(threat) for threat in islice(self.active_threats.values(), self.recent_size)],
+        }
@@ -0,0 +1,60 @@
+"""Content-addressed evidence store"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterable, NamedTuple
+
+
+class StoredArtifact(NamedTuple):
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+class EvidenceStore:
+    """Evidence artifacts on disk under ``root/objects/<sha256[:2]>/<sha256>``.
+
+    Uploads are streamed to a temporary file while being hashed and then
+    renamed into place, so identical artifacts are stored once no matter how
+    many cases reference them and memory use does not depend on their size.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.incoming = os.path.join(root, "incoming")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.incoming, exist_ok=True)
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.objects, sha256[:2], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.isfile(self.path(sha256))
+
+    async def write_stream(self, chunks: AsyncIterable[bytes]) -> StoredArtifact:
+        """Store the streamed artifact and return its digest, size and whether it was already present."""
+        loop = asyncio.get_running_loop()
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.incoming)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                async for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        size += len(chunk)
+                        await loop.run_in_executor(None, fh.write, chunk)
+            sha256 = digest.hexdigest()
+            target = self.path(sha256)
+            if os.path.exists(target):
+                os.unlink(temp_path)
+                return StoredArtifact(sha256, size, True)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(temp_path, target)
+            return StoredArtifact(sha256, size, False)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
@@ -0,0 +1,246 @@
+"""Indexed in-memory store"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections.abc import MutableMapping
+from itertools import islice
+
+
+class _Bucket:
+    """Insertion-ordered set of ids that can resume iteration after any member.
+
+    Ids live in an append-only list with their positions in a dict; removed
+    ids leave a ``None`` hole until the list is compacted.
+    """
+
+    __slots__ = ("_ids", "_pos")
+
+    def __init__(self):
+        self._ids: List[Optional[str]] = []
+        self._pos: Dict[str, int] = {}
+
+    def add(self, record_id: str) -> None:
+        if record_id not in self._pos:
+            self._pos[record_id] = len(self._ids)
+            self._ids.append(record_id)
+
+    def discard(self, record_id: str) -> None:
+        position = self._pos.pop(record_id, None)
+        if position is None:
+            return
+        self._ids[position] = None
+        if len(self._ids) > 2 * len(self._pos) + 32:
+            self._ids = [i for i in self._ids if i is not None]
+            self._pos = {record_id: position for position, record_id in enumerate(self._ids)}
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._pos
+
+    def __iter__(self) -> Iterator[str]:
+        return (record_id for record_id in self._ids if record_id is not None)
+
+    def __reversed__(self) -> Iterator[str]:
+        return (record_id for record_id in reversed(self._ids) if record_id is not None)
+
+    def after(self, record_id: str) -> Iterator[str]:
+        """Iterate the ids added after ``record_id``; raises KeyError if it is not a member."""
+        ids = self._ids
+        return (ids[i] for i in range(self._pos[record_id] + 1, len(ids)) if ids[i] is not None)
+
+
+class IndexedStore(MutableMapping):
+    """Dict of records keyed by id with secondary indexes on selected fields.
+
+    Each index maps a field value to an insertion-ordered bucket of record
+    ids, so filtered lookups resolve by intersecting buckets instead of
+    scanning every record, and pages resume directly after their cursor.
+    When a ``backend`` is given, every insert, update and delete is also
+    written through to its ``table``.
+    """
+
+    def __init__(self, key: str, indexes: Iterable[str] = (), backend: Optional[Any] = None, table: Optional[str] = None):
+        self.key = key
+        self.indexes: Dict[str, Dict[Any, _Bucket]] = {field: {} for field in indexes}
+        self.backend = backend
+        self.table = table
+        self._records: Dict[str, dict] = {}
+        self._all = _Bucket()
+
+    def __getitem__(self, record_id: str) -> dict:
+        return self._records[record_id]
+
+    def __setitem__(self, record_id: str, record: dict) -> None:
+        if record_id in self._records:
+            self._unindex(record_id, self._records[record_id])
+        self._records[record_id] = record
+        self._all.add(record_id)
+        self._index(record_id, record)
+        if self.backend is not None:
+            self.backend.save(self.table, record)
+
+    def __delitem__(self, record_id: str) -> None:
+        record = self._records.pop(record_id)
+        self._all.discard(record_id)
+        self._unindex(record_id, record)
+        if self.backend is not None:
+            self.backend.delete(self.table, record_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._records
+
+    def _index(self, record_id: str, record: dict) -> None:
+        for field, buckets in self.indexes.items():
+            self._add_to(buckets, record.get(field), record_id)
+
+    def _unindex(self, record_id: str, record: dict) -> None:
+        for field, buckets in self.indexes.items():
+            self._remove_from(buckets, record.get(field), record_id)
+
+    @staticmethod
+    def _add_to(buckets: Dict[Any, _Bucket], value: Any, record_id: str) -> None:
+        bucket = buckets.get(value)
+        if bucket is None:
+            bucket = buckets[value] = _Bucket()
+        bucket.add(record_id)
+
+    @staticmethod
+    def _remove_from(buckets: Dict[Any, _Bucket], value: Any, record_id: str) -> None:
+        bucket = buckets.get(value)
+        if bucket is not None:
+            bucket.discard(record_id)
+            if not bucket:
+                del buckets[value]
+
+    def merge(self, record_id: str, fields: Dict[str, Any]) -> dict:
+        """Update fields in place, keeping indexes in sync, without writing them through."""
+        record = self._records[record_id]
+        indexed = [field for field in fields if field in self.indexes and fields[field] != record.get(field)]
+        for field in indexed:
+            self._remove_from(self.indexes[field], record.get(field), record_id)
+        record.update(fields)
+        for field in indexed:
+            self._add_to(self.indexes[field], record.get(field), record_id)
+        return record
+
+    def update_fields(self, record_id: str, **fields: Any) -> dict:
+        """Update fields of a stored record in place, keeping indexes in sync.
+
+        Only the changed fields are written through, so concurrent writers
+        updating other fields of the same record do not overwrite each other.
+        """
+        record = self.merge(record_id, fields)
+        if self.backend is not None:
+            self.backend.patch(self.table, record_id, fields)
+        return record
+
+    def increment(self, record_id: str, field: str, amount: int = 1) -> int:
+        """Add ``amount`` to a numeric field and return the new value; the backend applies it atomically."""
+        value = self._records[record_id][field] + amount
+        self.merge(record_id, {field: value})
+        if self.backend is not None:
+            self.backend.increment(self.table, record_id, field, amount)
+        return value
+
+    def load(self, records: Iterable[dict]) -> None:
+        """Populate the store from persisted records without writing them back; known ids are replaced."""
+        for record in records:
+            record_id = record[self.key]
+            previous = self._records.get(record_id)
+            if previous is not None:
+                self._unindex(record_id, previous)
+            self._records[record_id] = record
+            self._all.add(record_id)
+            self._index(record_id, record)
+
+    def unload(self, record_ids: Iterable[str]) -> None:
+        """Drop records without writing the removal back, e.g. when another writer already deleted them."""
+        for record_id in record_ids:
+            record = self._records.pop(record_id, None)
+            if record is not None:
+                self._all.discard(record_id)
+                self._unindex(record_id, record)
+
+    def _buckets(self, criteria: Dict[str, Any]) -> Optional[List[_Bucket]]:
+        """Buckets for the non-``None`` criteria, smallest first; ``None`` if any is empty."""
+        criteria = {field: value for field, value in criteria.items() if value is not None}
+        if not criteria:
+            return [self._all]
+        buckets = []
+        for field, value in criteria.items():
+            if field not in self.indexes:
+                raise KeyError(f"Field {field} is not indexed")
+            bucket = self.indexes[field].get(value)
+            if not bucket:
+                return None
+            buckets.append(bucket)
+        return sorted(buckets, key=len)
+
+    def ids(self, **criteria: Any) -> List[str]:
+        """Return ids matching every ``field=value`` criterion, in insertion order.
+
+        Criteria whose value is ``None`` are ignored, matching the optional
+        query parameters of the API handlers.
+        """
+        return self.page_ids(None, None, **criteria)[0]
+
+    def page_ids(self, limit: Optional[int], after: Optional[str], **criteria: Any) -> Tuple[List[str], Optional[str]]:
+        """Return up to ``limit`` matching ids following the cursor id ``after``, and the next cursor.
+
+        The next cursor is ``None`` on the last page. Raises KeyError when
+        ``after`` is not a matching record, including once the cursor record
+        itself has been removed, so callers must restart paging then.
+        """
+        buckets = self._buckets(criteria)
+        if buckets is None:
+            if after is not None:
+                raise KeyError(after)
+            return [], None
+        smallest, rest = buckets[0], buckets[1:]
+        source = smallest.after(after) if after is not None else iter(smallest)
+        matches = (record_id for record_id in source if all(record_id in bucket for bucket in rest))
+        if limit is None:
+            return list(matches), None
+        ids = list(islice(matches, limit + 1))
+        if len(ids) > limit:
+            return ids[:limit], ids[limit - 1] if limit else after
+        return ids, None
+
+    def page(self, limit: Optional[int], after: Optional[str], **criteria: Any) -> Tuple[List[dict], Optional[str]]:
+        """Records for :meth:`page_ids`."""
+        ids, cursor = self.page_ids(limit, after, **criteria)
+        return [self._records[record_id] for record_id in ids], cursor
+
+    def recent(self, field: str, value: Any, limit: int) -> List[dict]:
+        """Return the last ``limit`` records whose indexed ``field`` equals ``value``, oldest first."""
+        bucket = self.indexes[field].get(value) or _Bucket()
+        newest = list(islice(reversed(bucket), limit))
+        return [self._records[record_id] for record_id in reversed(newest)]
+
+    def filter(self, **criteria: Any) -> List[dict]:
+        """Return records matching every ``field=value`` criterion, in insertion order."""
+        return [self._records[record_id] for record_id in self.ids(**criteria)]
+
+    def count(self, **criteria: Any) -> int:
+        """Count records matching the criteria; a single criterion is O(1)."""
+        criteria = {field: value for field, value in criteria.items() if value is not None}
+        if not criteria:
+            return len(self._records)
+        if len(criteria) == 1:
+            (field, value), = criteria.items()
+            if field not in self.indexes:
+                raise KeyError(f"Field {field} is not indexed")
+            return len(self.indexes[field].get(value, ()))
+        return len(self.ids(**criteria))
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._all = _Bucket()
+        for buckets in self.indexes.values():
+            buckets.clear()
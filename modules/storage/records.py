@@ -0,0 +1,103 @@
+"""Compact signal and threat records"""
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterator, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def pack_timestamp(value: Any) -> Any:
+    """Keep a naive ISO-8601 timestamp as integer microseconds when it round-trips exactly."""
+    if type(value) is str:
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if moment.tzinfo is None and moment.isoformat() == value:
+            return (moment - _EPOCH) // _MICROSECOND
+    return value
+
+
+@lru_cache(maxsize=65536)
+def _format_timestamp(value: int) -> str:
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+def unpack_timestamp(value: Any) -> Any:
+    return _format_timestamp(value) if type(value) is int else value
+
+
+class CompactRecord(Mapping):
+    """A ``__slots__`` record that reads and updates like the dict it replaces.
+
+    String fields listed in ``INTERNED`` share one object per distinct value
+    and ``TIMESTAMPS`` are held as integers, so a record costs a fixed
+    handful of pointers instead of a dict plus a private copy of every
+    string. Use ``dict(record)`` at the JSON boundary.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    DEFAULTS: Dict[str, Any] = {}
+    INTERNED: FrozenSet[str] = frozenset()
+    TIMESTAMPS: FrozenSet[str] = frozenset()
+    _GETTERS: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._GETTERS = {field: attrgetter(field) for field in cls.FIELDS}
+        for field in cls.TIMESTAMPS:
+            cls._GETTERS[field] = lambda record, _get=cls._GETTERS[field]: unpack_timestamp(_get(record))
+
+    def __init__(self, fields: Mapping):
+        for field in self.FIELDS:
+            self._set(field, fields.get(field, self.DEFAULTS.get(field)))
+
+    def _set(self, field: str, value: Any) -> None:
+        if field in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        elif field in self.TIMESTAMPS:
+            value = pack_timestamp(value)
+        setattr(self, field, value)
+
+    def __getitem__(self, field: str) -> Any:
+        return self._GETTERS[field](self)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        getter = self._GETTERS.get(field)
+        return default if getter is None else getter(self)
+
+    def __contains__(self, field: object) -> bool:
+        return field in self._GETTERS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def update(self, fields: Mapping) -> None:
+        for field, value in fields.items():
+            if field not in self._GETTERS:
+                raise KeyError(field)
+            self._set(field, value)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class SignalRecord(CompactRecord):
+    __slots__ = FIELDS = ("signal_id", "signal_type", "location", "strength", "source_id", "timestamp", "case_id", "latitude", "longitude", "fingerprint")
+    INTERNED = frozenset(("signal_type", "location", "source_id", "case_id", "fingerprint"))
+    TIMESTAMPS = frozenset(("timestamp",))
+
+
+class ThreatRecord(CompactRecord):
+    __slots__ = FIELDS = ("threat_id", "signal_id", "threat_level", "signal_type", "location", "detected_at", "case_id", "status", "ai_recommendations", "mitigation_applied", "signal_count", "last_seen_at")
+    DEFAULTS = {"status": "detected", "ai_recommendations": (), "mitigation_applied": False, "signal_count": 1, "last_seen_at": None}
+    INTERNED = frozenset(("threat_level", "signal_type", "location", "case_id", "status"))
+    TIMESTAMPS = frozenset(("detected_at", "last_seen_at"))
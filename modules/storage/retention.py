@@ -0,0 +1,160 @@
+"""Time-partitioned retention"""
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+PARTITION_MS = {"hourly": 3600 * 1000, "daily": 86400 * 1000}
+
+
+def _empty_rollup(partition_start: int) -> Dict[str, Any]:
+    return {"partition_start": partition_start, "signals": 0, "threats": 0, "signal_types": {}, "locations": {}, "threat_levels": {}, "sealed": False, "archived": False}
+
+
+def _bump(counts: Dict[str, int], key: Any) -> None:
+    counts[key] = counts.get(key, 0) + 1
+
+
+class RetentionPolicy:
+    """Buckets signals and threats into hourly or daily partitions by event time.
+
+    Every partition carries a rollup of counts per signal type, location and
+    threat level that is kept current as records arrive, so trend queries
+    never touch raw rows. Once a partition falls more than ``keep_partitions``
+    behind the current one, :meth:`expire` hands its raw rows back for
+    archiving and seals its rollup: from then on the rollup is persisted and
+    authoritative, and restored rows no longer count towards it. A sealed
+    partition is reported as archived only once no raw rows of any table
+    are left in it.
+    """
+
+    def __init__(self, archive_root: str, partition: str = "hourly", keep_partitions: int = 72):
+        if partition not in PARTITION_MS:
+            raise ValueError(f"Unknown partition size {partition!r}; expected one of {', '.join(PARTITION_MS)}")
+        self.archive_root = archive_root
+        self.partition = partition
+        self.partition_ms = PARTITION_MS[partition]
+        self.keep_partitions = keep_partitions
+        self.members: Dict[str, Dict[int, List[str]]] = {"signals": {}, "threats": {}}
+        self.rollups: Dict[int, Dict[str, Any]] = {}
+        self.dirty: Set[int] = set()
+
+    @classmethod
+    def from_config(cls, retention: Dict[str, Any], archive_root: str) -> "RetentionPolicy":
+        return cls(archive_root, partition=retention.get("partition", "hourly"), keep_partitions=retention.get("keep_partitions", 72))
+
+    def partition_of(self, epoch_ms: int) -> int:
+        return epoch_ms - epoch_ms % self.partition_ms
+
+    def _rollup(self, partition_start: int) -> Dict[str, Any]:
+        rollup = self.rollups.get(partition_start)
+        if rollup is None:
+            rollup = self.rollups[partition_start] = _empty_rollup(partition_start)
+        elif rollup["sealed"]:
+            rollup["archived"] = False
+            self.dirty.add(partition_start)
+        return rollup
+
+    def _restored_into_sealed(self, partition_start: int) -> bool:
+        """Whether a restored row belongs to a sealed partition, whose persisted rollup already counts it."""
+        rollup = self.rollups.get(partition_start)
+        if rollup is None or not rollup["sealed"]:
+            return False
+        rollup["archived"] = False
+        return True
+
+    def load_rollups(self, rollups: Iterable[Mapping[str, Any]]) -> None:
+        """Restore persisted rollups of sealed partitions."""
+        for rollup in rollups:
+            self.rollups[rollup["partition_start"]] = {**_empty_rollup(rollup["partition_start"]), "sealed": True, **rollup}
+
+    def add_signal(self, signal: Mapping[str, Any], epoch_ms: int, restoring: bool = False) -> None:
+        partition_start = self.partition_of(epoch_ms)
+        self.members["signals"].setdefault(partition_start, []).append(signal["signal_id"])
+        if restoring and self._restored_into_sealed(partition_start):
+            return
+        rollup = self._rollup(partition_start)
+        rollup["signals"] += 1
+        _bump(rollup["signal_types"], signal["signal_type"])
+        _bump(rollup["locations"], signal["location"])
+
+    def add_threat(self, threat: Mapping[str, Any], epoch_ms: int, restoring: bool = False) -> None:
+        partition_start = self.partition_of(epoch_ms)
+        self.members["threats"].setdefault(partition_start, []).append(threat["threat_id"])
+        if restoring and self._restored_into_sealed(partition_start):
+            return
+        rollup = self._rollup(partition_start)
+        rollup["threats"] += 1
+        _bump(rollup["threat_levels"], threat["threat_level"])
+
+    def expired(self, table: str, now_ms: int) -> List[int]:
+        cutoff = self.partition_of(now_ms) - self.keep_partitions * self.partition_ms
+        return sorted(start for start in self.members[table] if start < cutoff)
+
+    def expire(self, table: str, now_ms: int, keep: Optional[Callable[[str], bool]] = None) -> Dict[int, List[str]]:
+        """Detach the ids of every expired partition of ``table`` and seal those partitions.
+
+        Ids for which ``keep`` returns true stay in their partition and are
+        offered again on the next call; the partition is not archived while
+        any remain.
+        """
+        expired = {}
+        for start in self.expired(table, now_ms):
+            ids = self.members[table].pop(start)
+            if keep is not None:
+                kept = [record_id for record_id in ids if keep(record_id)]
+                if kept:
+                    self.members[table][start] = kept
+                    kept_ids = set(kept)
+                    ids = [record_id for record_id in ids if record_id not in kept_ids]
+            rollup = self.rollups[start]
+            archived = not any(start in members for members in self.members.values())
+            if not rollup["sealed"] or rollup["archived"] != archived:
+                rollup["sealed"], rollup["archived"] = True, archived
+                self.dirty.add(start)
+            expired[start] = ids
+        return expired
+
+    def reattach(self, table: str, partition_start: int, ids: List[str]) -> None:
+        """Give back ids handed out by :meth:`expire` that could not be archived; the next call offers them again."""
+        self.members[table][partition_start] = ids + self.members[table].get(partition_start, [])
+        rollup = self.rollups[partition_start]
+        if rollup["archived"]:
+            rollup["archived"] = False
+            self.dirty.add(partition_start)
+
+    def take_dirty(self) -> List[Dict[str, Any]]:
+        """Return sealed rollups changed since the last call, for persisting."""
+        rollups = [self.rollups[start] for start in sorted(self.dirty)]
+        self.dirty.clear()
+        return rollups
+
+    def archive_path(self, table: str, partition_start: int) -> str:
+        moment = datetime.fromtimestamp(partition_start / 1000, tz=timezone.utc)
+        name = moment.strftime("%Y-%m-%dT%H" if self.partition == "hourly" else "%Y-%m-%d")
+        return os.path.join(self.archive_root, table, f"{name}.ndjson.gz")
+
+    def write_archive(self, table: str, partition_start: int, records: Iterable[Mapping[str, Any]]) -> str:
+        """Append ``records`` as gzip NDJSON; late arrivals for a partition add another gzip member."""
+        path = self.archive_path(table, partition_start)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "at", encoding="utf-8") as fh:
+            for record in records:
+                fh.write(json.dumps(record, default=dict))
+                fh.write("\n")
+        return path
+
+    def trends(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None, include_locations: bool = False) -> List[Dict[str, Any]]:
+        """Per-partition counts between ``start_ms`` and ``end_ms``, oldest first, hot and archived alike."""
+        first = None if start_ms is None else self.partition_of(start_ms)
+        partitions = []
+        for start in sorted(self.rollups):
+            if (first is not None and start < first) or (end_ms is not None and start > end_ms):
+                continue
+            rollup = self.rollups[start]
+            entry = {"partition_start": datetime.fromtimestamp(start / 1000, tz=timezone.utc).isoformat(), "archived": rollup["archived"], "signals": rollup["signals"], "threats": rollup["threats"], "signal_types": dict(rollup["signal_types"]), "threat_levels": dict(rollup["threat_levels"])}
+            if include_locations:
+                entry["locations"] = dict(rollup["locations"])
+            partitions.append(entry)
+        return partitions
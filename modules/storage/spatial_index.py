@@ -0,0 +1,207 @@
+"""Spatio-temporal signal index"""
+import math
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+_COORDINATES = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """Return the (latitude, longitude) extent in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def parse_coordinates(location: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Read a ``"lat,lon"`` location string; other free-form locations have no coordinates."""
+    match = _COORDINATES.match(location or "")
+    if not match:
+        return None
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        return None
+    return latitude, longitude
+
+
+def utc_now() -> str:
+    """The current time as a naive ISO-8601 string in UTC, the form every stored timestamp uses."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def to_utc(timestamp: str) -> str:
+    """Normalize an ISO-8601 timestamp to the stored naive UTC form; raises ValueError if it does not parse."""
+    try:
+        moment = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp {timestamp!r}") from None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def parse_epoch_ms(timestamp: Optional[str], default: Optional[int] = None, strict: bool = False) -> int:
+    """Convert an ISO-8601 timestamp to epoch milliseconds; naive values are UTC.
+
+    Missing values, and unparseable ones unless ``strict`` is set (then
+    ValueError is raised), give ``default`` or the current time.
+    """
+    if timestamp:
+        try:
+            moment = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            if strict:
+                raise ValueError(f"Invalid timestamp {timestamp!r}") from None
+        else:
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            return int(moment.timestamp() * 1000)
+    return default if default is not None else int(time.time() * 1000)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+class _Cell:
+    """Signals of one geohash cell as parallel arrays sorted by time."""
+
+    __slots__ = ("times", "ids", "lats", "lons")
+
+    def __init__(self):
+        self.times = array("q")
+        self.ids: List[str] = []
+        self.lats = array("d")
+        self.lons = array("d")
+
+    def insert(self, epoch_ms: int, signal_id: str, latitude: float, longitude: float) -> None:
+        if not self.times or epoch_ms >= self.times[-1]:
+            position = len(self.times)
+        else:
+            position = bisect_right(self.times, epoch_ms)
+        self.times.insert(position, epoch_ms)
+        self.ids.insert(position, signal_id)
+        self.lats.insert(position, latitude)
+        self.lons.insert(position, longitude)
+
+    def remove(self, epoch_ms: int, signal_id: str) -> bool:
+        position = bisect_left(self.times, epoch_ms)
+        while position < len(self.times) and self.times[position] == epoch_ms:
+            if self.ids[position] == signal_id:
+                for column in (self.times, self.ids, self.lats, self.lons):
+                    del column[position]
+                return True
+            position += 1
+        return False
+
+
+class SpatioTemporalIndex:
+    """Geohash buckets of time-sorted signals for box, radius and time-window queries.
+
+    A query visits only the cells overlapping its bounding box (or only the
+    populated cells, if fewer), and within each cell binary-searches the
+    time window, so its cost follows the matches rather than the total
+    number of signals.
+    """
+
+    def __init__(self, precision: int = 6):
+        self.precision = precision
+        self.cell_height, self.cell_width = geohash_cell_size(precision)
+        self.cells: Dict[str, _Cell] = {}
+        self._entries: Dict[str, Tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, signal_id: object) -> bool:
+        return signal_id in self._entries
+
+    def add(self, signal_id: str, latitude: float, longitude: float, epoch_ms: int) -> None:
+        if signal_id in self._entries:
+            self.discard(signal_id)
+        cell_key = geohash_encode(latitude, longitude, self.precision)
+        cell = self.cells.get(cell_key)
+        if cell is None:
+            cell = self.cells[cell_key] = _Cell()
+        cell.insert(epoch_ms, signal_id, latitude, longitude)
+        self._entries[signal_id] = (cell_key, epoch_ms)
+
+    def discard(self, signal_id: str) -> None:
+        entry = self._entries.pop(signal_id, None)
+        if entry is None:
+            return
+        cell_key, epoch_ms = entry
+        cell = self.cells[cell_key]
+        cell.remove(epoch_ms, signal_id)
+        if not cell.times:
+            del self.cells[cell_key]
+
+    def _cells_in(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[_Cell]:
+        lat_steps = int(max_lat // self.cell_height) - int(min_lat // self.cell_height) + 1
+        lon_steps = int(max_lon // self.cell_width) - int(min_lon // self.cell_width) + 1
+        if lat_steps * lon_steps > len(self.cells):
+            return list(self.cells.values())
+        cells = []
+        for i in range(lat_steps):
+            latitude = min(90.0, (math.floor(min_lat / self.cell_height) + i + 0.5) * self.cell_height)
+            for j in range(lon_steps):
+                longitude = min(180.0, (math.floor(min_lon / self.cell_width) + j + 0.5) * self.cell_width)
+                cell = self.cells.get(geohash_encode(latitude, longitude, self.precision))
+                if cell is not None:
+                    cells.append(cell)
+        return cells
+
+    def search_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Return ``(epoch_ms, signal_id)`` pairs inside the box and time window, oldest first."""
+        matches = []
+        for cell in self._cells_in(min_lat, min_lon, max_lat, max_lon):
+            lo = 0 if start_ms is None else bisect_left(cell.times, start_ms)
+            hi = len(cell.times) if end_ms is None else bisect_right(cell.times, end_ms)
+            for k in range(lo, hi):
+                if min_lat <= cell.lats[k] <= max_lat and min_lon <= cell.lons[k] <= max_lon:
+                    matches.append((cell.times[k], cell.ids[k]))
+        matches.sort()
+        return matches
+
+    def search_radius(self, latitude: float, longitude: float, radius_km: float, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Return ``(epoch_ms, signal_id)`` pairs within ``radius_km`` and the time window, oldest first."""
+        lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+        lon_delta = 180.0 if abs(latitude) + lat_delta >= 90.0 else math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+        box = (max(-90.0, latitude - lat_delta), max(-180.0, longitude - lon_delta), min(90.0, latitude + lat_delta), min(180.0, longitude + lon_delta))
+        matches = []
+        for cell in self._cells_in(*box):
+            lo = 0 if start_ms is None else bisect_left(cell.times, start_ms)
+            hi = len(cell.times) if end_ms is None else bisect_right(cell.times, end_ms)
+            for k in range(lo, hi):
+                if haversine_km(latitude, longitude, cell.lats[k], cell.lons[k]) <= radius_km:
+                    matches.append((cell.times[k], cell.ids[k]))
+        matches.sort()
+        return matches
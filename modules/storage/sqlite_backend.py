@@ -0,0 +1,305 @@
+"""SQLite persistence backend"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# table -> (primary key, indexed columns, record keys kept out of the JSON document)
+TABLES: Dict[str, Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = {
+    "cases": ("case_id", ("status",), ("evidence",)),
+    "evidence": ("evidence_id", ("case_id",), ()),
+    "signals": ("signal_id", ("signal_type", "case_id"), ()),
+    "threats": ("threat_id", ("threat_level", "case_id", "signal_id"), ()),
+    "recommendations": ("recommendation_id", ("threat_id",), ()),
+    "rollups": ("partition_start", (), ()),
+}
+
+_STOP = object()
+# error messages of failures that clear up on their own: lock contention, a full disk, I/O hiccups
+TRANSIENT_ERRORS = ("locked", "busy", "full", "disk i/o")
+
+logger = logging.getLogger(__name__)
+
+
+def path_from_url(url: str, root: Optional[str] = None) -> str:
+    """Translate a ``sqlite:///relative``, ``sqlite:////absolute`` or ``sqlite://`` URL to a path.
+
+    Relative paths are resolved against ``root`` when one is given.
+    """
+    if not url.startswith("sqlite://"):
+        raise ValueError(f"Unsupported database url: {url}")
+    path = url[len("sqlite://"):]
+    if path in ("", "/", "/:memory:"):
+        return ":memory:"
+    path = path[1:]
+    return os.path.join(root, path) if root is not None and not os.path.isabs(path) else path
+
+
+def _is_transient(error: sqlite3.Error) -> bool:
+    return isinstance(error, sqlite3.OperationalError) and any(text in str(error).lower() for text in TRANSIENT_ERRORS)
+
+
+class SQLiteBackend:
+    """Write-behind persistence of API entities into a single SQLite file.
+
+    Writes are serialized on the caller's thread, queued, and applied by one
+    writer thread that groups up to ``batch_size`` operations (or whatever
+    arrives within ``linger`` seconds) into a single WAL transaction.
+
+    With ``shared`` set, several processes may use the same file: triggers
+    append every row change to a ``changes`` log that each process tails
+    with :meth:`changes_since` to keep its in-memory view current, and
+    :meth:`fetch` reads rows another process committed before they arrive.
+    Reads use their own connection, so under WAL they never wait for the
+    writer thread's transactions.
+
+    A batch that fails transiently (busy, locked, disk full) is retried with
+    exponential backoff for up to ``max_retry_time`` seconds and then
+    dropped, so an outage cannot grow the queue or stall :meth:`sync`
+    forever. Any other error is confined to the statements that cause it by
+    replaying the batch one write at a time.
+    """
+
+    retry_delay = 0.05
+    max_retry_delay = 5.0
+    max_retry_time = 60.0
+
+    def __init__(self, path: str, batch_size: int = 500, linger: float = 0.005, shared: bool = False):
+        if shared and path == ":memory:":
+            raise ValueError("Shared state needs a database file, not an in-memory database")
+        self.path = path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.shared = shared
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._create_schema()
+        if path == ":memory:":
+            self._reader, self._read_lock = self._conn, self._lock
+        else:
+            self._reader, self._read_lock = sqlite3.connect(path, check_same_thread=False, isolation_level=None), threading.Lock()
+            self._reader.execute("PRAGMA busy_timeout=10000")
+        self._upsert_sql = {table: self._build_upsert(table) for table in TABLES}
+        self._delete_sql = {table: f"DELETE FROM {table} WHERE {key} = ?" for table, (key, _, _) in TABLES.items()}
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, database: Dict[str, Any], root: Optional[str] = None) -> "SQLiteBackend":
+        return cls(path_from_url(database["url"], root), batch_size=database.get("batch_size", 500), linger=database.get("linger_ms", 5) / 1000, shared=database.get("shared", False))
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            for table, (key, columns, _) in TABLES.items():
+                column_defs = "".join(f", {column} TEXT" for column in columns)
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({key} TEXT PRIMARY KEY{column_defs}, data TEXT NOT NULL)")
+                for column in columns:
+                    self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, record_id TEXT NOT NULL, changed_at REAL NOT NULL DEFAULT (julianday('now')))")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+            for table, (key, _, _) in TABLES.items():
+                for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+                    trigger = f"changes_{table}_{event.lower()}"
+                    if self.shared:
+                        self._conn.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table} BEGIN INSERT INTO changes (tbl, record_id) VALUES ('{table}', {row}.{key}); END")
+                    else:
+                        self._conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    def _build_upsert(self, table: str) -> str:
+        key, columns, _ = TABLES[table]
+        names = (key,) + columns + ("data",)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        return f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) ON CONFLICT({key}) DO UPDATE SET {updates}"
+
+    def save(self, table: str, record: dict, **columns: Any) -> None:
+        """Queue an upsert of ``record``; ``columns`` supply indexed values not present in it."""
+        key, indexed, omit = TABLES[table]
+        document = {k: v for k, v in record.items() if k not in omit} if omit or not isinstance(record, dict) else record
+        values = (record[key],) + tuple(columns[c] if c in columns else record.get(c) for c in indexed) + (json.dumps(document),)
+        self._queue.put((self._upsert_sql[table], values))
+
+    def patch(self, table: str, record_id: str, fields: Dict[str, Any]) -> None:
+        """Queue an in-place update of some fields, leaving the rest of the stored record untouched."""
+        key, indexed, omit = TABLES[table]
+        fields = {field: value for field, value in fields.items() if field not in omit}
+        if not fields:
+            return
+        columns = [column for column in indexed if column in fields]
+        assignments = "".join(f"{column} = ?, " for column in columns)
+        paths = ", ".join(f"'$.{field}', json(?)" for field in fields)
+        values = tuple(fields[column] for column in columns) + tuple(json.dumps(value) for value in fields.values()) + (record_id,)
+        self._queue.put((f"UPDATE {table} SET {assignments}data = json_set(data, {paths}) WHERE {key} = ?", values))
+
+    def increment(self, table: str, record_id: str, field: str, amount: int = 1) -> None:
+        """Queue an atomic ``field += amount`` evaluated by SQLite against the stored value."""
+        key = TABLES[table][0]
+        self._queue.put((f"UPDATE {table} SET data = json_set(data, '$.{field}', coalesce(json_extract(data, '$.{field}'), 0) + ?) WHERE {key} = ?", (amount, record_id)))
+
+    def delete(self, table: str, record_id: str) -> None:
+        self._queue.put((self._delete_sql[table], (record_id,)))
+
+    def delete_where(self, table: str, column: str, value: Any) -> None:
+        if column not in TABLES[table][1]:
+            raise KeyError(f"Column {column} is not indexed on {table}")
+        self._queue.put((f"DELETE FROM {table} WHERE {column} = ?", (value,)))
+
+    def fetch(self, table: str, record_id: str) -> Optional[Tuple[Dict[str, Any], dict]]:
+        """Read the committed ``(indexed columns, record)`` of one row, or ``None`` if there is no such row."""
+        rows = self.fetch_where(table, TABLES[table][0], record_id)
+        return rows[0] if rows else None
+
+    def fetch_where(self, table: str, column: str, value: Any) -> List[Tuple[Dict[str, Any], dict]]:
+        """Read the committed rows whose key or indexed ``column`` equals ``value``."""
+        key, indexed, _ = TABLES[table]
+        if column != key and column not in indexed:
+            raise KeyError(f"Column {column} is not indexed on {table}")
+        with self._read_lock:
+            rows = self._reader.execute(f"SELECT {', '.join(indexed + ('data',))} FROM {table} WHERE {column} = ? ORDER BY rowid", (value,)).fetchall()
+        return [(dict(zip(indexed, row[:-1])), json.loads(row[-1])) for row in rows]
+
+    def load(self, table: str) -> Iterator[Tuple[Dict[str, Any], dict]]:
+        """Yield ``(indexed columns, record)`` pairs in insertion order."""
+        _, indexed, _ = TABLES[table]
+        with self._read_lock:
+            rows = self._reader.execute(f"SELECT {', '.join(indexed + ('data',))} FROM {table} ORDER BY rowid").fetchall()
+        for row in rows:
+            yield dict(zip(indexed, row[:-1])), json.loads(row[-1])
+
+    def last_change(self) -> int:
+        with self._read_lock:
+            return self._reader.execute("SELECT coalesce(max(seq), 0) FROM changes").fetchone()[0]
+
+    def changes_since(self, seq: int, limit: int = 10000) -> Tuple[int, List[Tuple[str, str, Optional[Dict[str, Any]], Optional[dict]]]]:
+        """Return the newest change sequence and ``(table, id, columns, record)`` for rows changed after ``seq``.
+
+        Each row is reported once with its current state (``record`` is
+        ``None`` if it was deleted), grouped in :data:`TABLES` order so parents
+        are applied before the rows that reference them.
+        """
+        with self._read_lock:
+            rows = self._reader.execute("SELECT seq, tbl, record_id FROM changes WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit)).fetchall()
+            if not rows:
+                return seq, []
+            changed: Dict[str, Dict[str, None]] = {table: {} for table in TABLES}
+            for _, table, record_id in rows:
+                changed[table].pop(record_id, None)
+                changed[table][record_id] = None
+            result = []
+            for table, record_ids in changed.items():
+                key, indexed, _ = TABLES[table]
+                ids = list(record_ids)
+                current: Dict[str, tuple] = {}
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    query = f"SELECT {', '.join((key,) + indexed + ('data',))} FROM {table} WHERE {key} IN ({', '.join('?' * len(chunk))})"
+                    current.update((str(row[0]), row[1:]) for row in self._reader.execute(query, chunk))
+                for record_id in ids:
+                    row = current.get(record_id)
+                    result.append((table, record_id, None, None) if row is None else (table, record_id, dict(zip(indexed, row[:-1])), json.loads(row[-1])))
+        return rows[-1][0], result
+
+    def prune_changes(self, max_age: float) -> None:
+        """Queue removal of change log entries older than ``max_age`` seconds."""
+        self._queue.put(("DELETE FROM changes WHERE changed_at < julianday('now') - ?", (max_age / 86400.0,)))
+
+    def try_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Take or renew the named lease for ``ttl`` seconds; returns whether ``owner`` holds it."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT INTO leases (name, owner, expires) VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires = excluded.expires WHERE leases.owner = excluded.owner OR leases.expires < ?", (name, owner, now + ttl, now))
+            return self._conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()[0] == owner
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Any] = [self._queue.get()]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            ops = [op for op in batch if type(op) is tuple]
+            if ops:
+                self._write(ops)
+            for op in batch:
+                if type(op) is threading.Event:
+                    op.set()
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, ops: List[Tuple[str, tuple]]) -> None:
+        delay = self.retry_delay
+        deadline = time.monotonic() + self.max_retry_time
+        while True:
+            try:
+                self._commit(ops)
+                return
+            except sqlite3.Error as error:
+                failure = error
+                if not _is_transient(error):
+                    break
+                if time.monotonic() + delay > deadline:
+                    logger.error("Dropped %d writes after retrying for %.0fs", len(ops), self.max_retry_time, exc_info=error)
+                    return
+                logger.warning("Write of %d operations failed (%s); retrying in %.2fs", len(ops), error, delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+        if len(ops) == 1:
+            logger.error("Dropped write: %s", ops[0][0], exc_info=failure)
+            return
+        for op in ops:
+            self._write([op])
+
+    def _commit(self, ops: List[Tuple[str, tuple]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                start = 0
+                for end in range(1, len(ops) + 1):
+                    if end == len(ops) or ops[end][0] != ops[start][0]:
+                        self._conn.executemany(ops[start][0], [values for _, values in ops[start:end]])
+                        start = end
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def flush(self) -> None:
+        """Block until every queued write has been committed."""
+        self._queue.join()
+
+    def sync(self, timeout: Optional[float] = None) -> bool:
+        """Block until the writes queued so far are committed; unlike :meth:`flush`, later writes do not delay it."""
+        committed = threading.Event()
+        self._queue.put(committed)
+        return committed.wait(timeout)
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
+        if self._reader is not self._conn:
+            with self._read_lock:
+                self._reader.close()
+
+
+def open_backend(database: Optional[Dict[str, Any]], root: Optional[str] = None) -> Optional[SQLiteBackend]:
+    """Open the backend described by the ``database`` config section, if any; relative paths resolve against ``root``."""
+    if not database or not database.get("url"):
+        return None
+    return SQLiteBackend.from_config(database, root)
@@ -0,0 +1,4 @@
+"""Threat intelligence"""
+from modules.threat_intelligence.recommendations import RecommendationEngine, RecommendationTemplate
+
+__all__ = ["RecommendationEngine", "RecommendationTemplate"]
@@ -0,0 +1,47 @@
+"""Recommendation engine"""
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Tuple
+
+import yaml
+
+
+class RecommendationTemplate(NamedTuple):
+    threat_level: str
+    threat_description: str
+    ai_analysis: str
+    mitigation_commands: Tuple[str, ...]
+    recommended_action: str
+
+
+class RecommendationEngine:
+    """Serves immutable per-(signal_type, threat_level) recommendation templates.
+
+    Playbooks are loaded once; templates for every playbook combination are
+    built up front and any other combination is built on first use and
+    cached.
+    """
+
+    def __init__(self, playbooks: Dict[str, Any]):
+        self.commands = {signal_type: {level: tuple(cmds) for level, cmds in levels.items()} for signal_type, levels in playbooks.get("mitigation_commands", {}).items()}
+        self.default_commands = tuple(playbooks.get("default_commands", ["log_signal()"]))
+        self.analysis = dict(playbooks.get("analysis", {}))
+        self.default_analysis = playbooks.get("default_analysis", "Unknown signal")
+        self.threat_context = dict(playbooks.get("threat_context", {}))
+        self.actions = dict(playbooks.get("actions", {}))
+        self.default_action = playbooks.get("default_action", "Monitor and log")
+        self.templates: Dict[Tuple[str, str], RecommendationTemplate] = {(signal_type, level): self._build(signal_type, level) for signal_type, levels in self.commands.items() for level in levels}
+        self._fallback = lru_cache(maxsize=1024)(self._build)
+
+    @classmethod
+    def from_yaml(cls, path: str) -> "RecommendationEngine":
+        with open(path) as fh:
+            return cls(yaml.safe_load(fh) or {})
+
+    def _build(self, signal_type: str, threat_level: str) -> RecommendationTemplate:
+        commands = self.commands.get(signal_type, {}).get(threat_level, self.default_commands)
+        analysis = f"{self.analysis.get(signal_type, self.default_analysis)} - {self.threat_context.get(threat_level, '')}"
+        return RecommendationTemplate(threat_level, f"{signal_type.upper()} threat", analysis, commands, self.actions.get(threat_level, self.default_action))
+
+    def template(self, signal_type: str, threat_level: str) -> RecommendationTemplate:
+        template = self.templates.get((signal_type, threat_level))
+        return template if template is not None else self._fallback(signal_type, threat_level)
@@ -0,0 +1,4 @@
+"""Visualization"""
+from modules.visualization.live_feed import LiveFeed, Subscriber
+
+__all__ = ["LiveFeed", "Subscriber"]
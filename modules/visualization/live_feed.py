@@ -0,0 +1,100 @@
+"""Live dashboard feed"""
+import asyncio
+import json
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+
+class Subscriber:
+    """Bounded per-client buffer of pre-serialized events.
+
+    Events of a ``latest_only`` type keep only their newest value. Other
+    events queue up to ``max_buffer``; past that the oldest is dropped and
+    the client is sent a ``resync`` event on its next delivery.
+    """
+
+    def __init__(self, max_buffer: int):
+        self.pending: Deque[Tuple[str, str]] = deque(maxlen=max_buffer)
+        self.latest: Dict[str, str] = {}
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, event_type: str, data: str, latest_only: bool) -> None:
+        if latest_only:
+            self.latest[event_type] = data
+        else:
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.pending.append((event_type, data))
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def drain(self) -> List[str]:
+        """Return pending events as SSE messages, merging runs of the same type into one JSON array."""
+        messages = []
+        if self.dropped:
+            messages.append(f"event: resync\ndata: {json.dumps({'dropped': self.dropped})}\n\n")
+            self.dropped = 0
+        for event_type, run in groupby(self.pending, key=itemgetter(0)):
+            messages.append(f"event: {event_type}\ndata: [{','.join(data for _, data in run)}]\n\n")
+        for event_type, data in self.latest.items():
+            messages.append(f"event: {event_type}\ndata: [{data}]\n\n")
+        self.pending.clear()
+        self.latest.clear()
+        self._ready.clear()
+        return messages
+
+
+class LiveFeed:
+    """Fans out API events to every connected dashboard as server-sent events.
+
+    Each event is serialized once in ``publish`` and shared by all
+    subscribers, so the cost of an update does not depend on how the
+    dashboards render it. Mapping payloads such as compact records are
+    serialized as objects.
+    """
+
+    def __init__(self, max_buffer: int = 256, heartbeat: float = 15.0):
+        self.max_buffer = max_buffer
+        self.heartbeat = heartbeat
+        self.subscribers: Set[Subscriber] = set()
+        self.published = 0
+
+    def publish(self, event_type: str, payload: Any, latest_only: bool = False) -> None:
+        if not self.subscribers:
+            return
+        data = json.dumps(payload, default=dict)
+        for subscriber in self.subscribers:
+            subscriber.push(event_type, data, latest_only)
+        self.published += 1
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_buffer)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    async def stream(self, is_disconnected: Callable[[], Any], snapshot: Optional[Callable[[], Any]] = None) -> AsyncIterator[str]:
+        """Yield SSE messages for one client until it disconnects."""
+        subscriber = self.subscribe()
+        try:
+            if snapshot is not None:
+                yield f"event: snapshot\ndata: {json.dumps(snapshot())}\n\n"
+            while not await is_disconnected():
+                if await subscriber.wait(self.heartbeat):
+                    for message in subscriber.drain():
+                        yield message
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
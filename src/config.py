@@ -1,2 +1,40 @@
 """Config"""
-pass
+import os
+from typing import Any, Dict, Optional
+
+import yaml
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "default.yaml")
+
+
+def resolve_path(path: str) -> str:
+    """Resolve a config-relative path against the project root."""
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the YAML config from ``path``, ``$WHITEKNIGHT_CONFIG`` or ``config/default.yaml``."""
+    path = path or os.environ.get("WHITEKNIGHT_CONFIG", DEFAULT_CONFIG_PATH)
+    with open(path) as fh:
+        config = yaml.safe_load(fh) or {}
+    config.setdefault("detection", {})
+    config.setdefault("live_feed", {})
+    config.setdefault("spatial_index", {})
+    config.setdefault("source_clusters", {})
+    config.setdefault("monitoring", {}).setdefault("profiler", {})
+    config.setdefault("threat_intelligence", {}).setdefault("playbooks", "config/playbooks.yaml")
+    database = config.setdefault("database", {})
+    if "WHITEKNIGHT_DATABASE_URL" in os.environ:
+        database["url"] = os.environ["WHITEKNIGHT_DATABASE_URL"]
+    if "WHITEKNIGHT_SHARED_STATE" in os.environ:
+        database["shared"] = os.environ["WHITEKNIGHT_SHARED_STATE"].lower() in ("1", "true", "yes")
+    server = config.setdefault("server", {})
+    server["workers"] = int(os.environ.get("WHITEKNIGHT_WORKERS", server.get("workers", 1)))
+    if server["workers"] > 1:
+        database["shared"] = True
+    evidence = config.setdefault("evidence", {})
+    evidence["root"] = os.environ.get("WHITEKNIGHT_EVIDENCE_ROOT", evidence.get("root", "data/evidence"))
+    retention = config.setdefault("retention", {})
+    retention["archive_root"] = os.environ.get("WHITEKNIGHT_ARCHIVE_ROOT", retention.get("archive_root", "data/archive"))
+    return config
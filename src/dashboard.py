@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 """WhiteKnight AI Fortress - Enterprise SOC Dashboard"""
 
-from flask import Flask, render_template_string, jsonify
-from datetime import datetime
+import json
+import os
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import urlopen
+from flask import Flask, render_template_string, jsonify, request
+from datetime import datetime, timezone
 
 app = Flask(__name__)
+API_URL = os.environ.get("WHITEKNIGHT_API_URL", "http://localhost:8000")
 
 DASHBOARD_HTML = """
 <!DOCTYPE html>
@@ -66,7 +72,7 @@ DASHBOARD_HTML = """
     <div class="navbar">
         <div class="navbar-brand">🚨 WhiteKnight AI Fortress</div>
         <div class="navbar-right">
-            <span><span class="status-indicator"></span>SYSTEM OPERATIONAL</span>
+            <span><span class="status-indicator"></span><span id="feed-status">CONNECTING</span></span>
             <span id="current-time">00:00:00</span>
         </div>
     </div>
@@ -99,10 +105,10 @@ DASHBOARD_HTML = """
             <div class="header">
                 <h1>ENTERPRISE SECURITY OPERATIONS CENTER</h1>
                 <div class="header-info">
-                    <div class="info-box"><div class="info-label">System Status</div><div class="info-value">● ACTIVE</div></div>
-                    <div class="info-box"><div class="info-label">Threats Detected</div><div class="info-value">3</div></div>
-                    <div class="info-box"><div class="info-label">Detection Rate</div><div class="info-value">98.7%</div></div>
-                    <div class="info-box"><div class="info-label">Uptime</div><div class="info-value">99.8%</div></div>
+                    <div class="info-box"><div class="info-label">System Status</div><div class="info-value" id="system-status">--</div></div>
+                    <div class="info-box"><div class="info-label">Threats Detected</div><div class="info-value" id="threats-detected">--</div></div>
+                    <div class="info-box"><div class="info-label">Signals Tracked</div><div class="info-value" id="signals-tracked">--</div></div>
+                    <div class="info-box"><div class="info-label">Uptime</div><div class="info-value" id="uptime">--</div></div>
                 </div>
             </div>
             
@@ -110,35 +116,27 @@ DASHBOARD_HTML = """
                 <div class="panel">
                     <div class="panel-header">► ACTIVE THREATS</div>
                     <div class="panel-content">
-                        <ul class="threat-list">
-                            <li class="critical">[CRITICAL] Suspicious Network Activity - Port 443 Data Exfiltration</li>
-                            <li class="warning">[WARNING] Brute Force Attack Detected - SSH Protocol 192.168.1.x</li>
-                            <li class="info">[INFO] Policy Violation - Unauthorized Application Execution</li>
-                        </ul>
+                        <ul class="threat-list" id="active-threats"></ul>
                     </div>
                 </div>
                 
                 <div class="panel">
                     <div class="panel-header">► SYSTEM LOG</div>
-                    <div class="panel-content">
-                        <div class="log-entry"><span class="log-time">[08:35:12]</span> <span class="log-info">WhiteKnight AI Fortress initialized</span></div>
-                        <div class="log-entry"><span class="log-time">[08:35:14]</span> <span class="log-info">Loading threat detection modules...</span></div>
-                        <div class="log-entry"><span class="log-time">[08:35:16]</span> <span class="log-info">Database connection established</span></div>
-                        <div class="log-entry"><span class="log-time">[08:35:18]</span> <span class="log-info">Real-time monitoring activated</span></div>
-                        <div class="log-entry"><span class="log-time">[08:35:20]</span> <span class="log-critical">CRITICAL: Network anomaly detected</span></div>
-                        <div class="log-entry"><span class="log-time">[08:35:22]</span> <span class="log-warning">WARNING: Brute force attack detected</span></div>
-                        <div class="log-entry"><span class="log-time">[08:35:24]</span> <span class="log-info">Threat analysis in progress...</span></div>
-                    </div>
+                    <div class="panel-content" id="system-log"></div>
                 </div>
                 
                 <div class="panel">
                     <div class="panel-header">► STATISTICS</div>
                     <div class="panel-content">
                         <div class="stats-grid">
-                            <div class="stat-item"><div class="stat-label">Total Threats</div><div class="stat-value">12,487</div></div>
-                            <div class="stat-item"><div class="stat-label">Blocked Today</div><div class="stat-value">47</div></div>
-                            <div class="stat-item"><div class="stat-label">False Positive Rate</div><div class="stat-value">0.3%</div></div>
-                            <div class="stat-item"><div class="stat-label">Avg Response Time</div><div class="stat-value">245ms</div></div>
+                            <div class="stat-item"><div class="stat-label">Total Threats</div><div class="stat-value" id="total-threats">--</div></div>
+                            <div class="stat-item"><div class="stat-label">Mitigated</div><div class="stat-value" id="mitigated-threats">--</div></div>
+                            <div class="stat-item"><div class="stat-label">Critical</div><div class="stat-value" id="critical-threats">--</div></div>
+                            <div class="stat-item"><div class="stat-label">High</div><div class="stat-value" id="high-threats">--</div></div>
+                            <div class="stat-item"><div class="stat-label">API Requests</div><div class="stat-value" id="api-requests">--</div></div>
+                            <div class="stat-item"><div class="stat-label">API p99</div><div class="stat-value" id="api-p99">--</div></div>
+                            <div class="stat-item"><div class="stat-label">In Flight</div><div class="stat-value" id="api-in-flight">--</div></div>
+                            <div class="stat-item"><div class="stat-label">Detection Queue</div><div class="stat-value" id="detection-queue">--</div></div>
                         </div>
                     </div>
                 </div>
@@ -161,7 +159,7 @@ DASHBOARD_HTML = """
     </div>
     
     <div class="footer">
-        WhiteKnight AI Fortress v1.0.0 | Fighting human trafficking through cybersecurity | Last update: 08:35:24 UTC
+        WhiteKnight AI Fortress v1.0.0 | Fighting human trafficking through cybersecurity | Last update: <span id="last-update">--</span>
     </div>
     
     <script>
@@ -172,6 +170,86 @@ DASHBOARD_HTML = """
         }
         updateTime();
         setInterval(updateTime, 1000);
+
+        const LEVEL_CLASS = { critical: 'critical', high: 'critical', medium: 'warning', low: 'info' };
+        const MAX_LOG = 50;
+
+        function text(id, value) {
+            document.getElementById(id).textContent = value;
+        }
+
+        function log(message, cls) {
+            const entry = document.createElement('div');
+            entry.className = 'log-entry';
+            const time = document.createElement('span');
+            time.className = 'log-time';
+            time.textContent = '[' + new Date().toLocaleTimeString('en-US', { hour12: false }) + ']';
+            const body = document.createElement('span');
+            body.className = cls;
+            body.textContent = message;
+            entry.append(time, ' ', body);
+            const panel = document.getElementById('system-log');
+            panel.prepend(entry);
+            while (panel.childElementCount > MAX_LOG) panel.lastElementChild.remove();
+        }
+
+        function renderStatus(dashboard) {
+            const status = dashboard.real_time_status;
+            text('threats-detected', status.active_threats);
+            text('signals-tracked', status.total_signals_detected);
+            text('total-threats', status.total_threats);
+            text('mitigated-threats', status.mitigated_threats);
+            text('critical-threats', dashboard.threat_analysis.critical_count);
+            text('high-threats', dashboard.threat_analysis.high_count);
+            const list = document.getElementById('active-threats');
+            list.replaceChildren(...dashboard.active_threats.map(function (threat) {
+                const item = document.createElement('li');
+                item.className = LEVEL_CLASS[threat.threat_level] || 'info';
+                item.textContent = '[' + threat.threat_level.toUpperCase() + '] ' + threat.signal_type.toUpperCase() + ' threat at ' + threat.location;
+                return item;
+            }));
+            text('last-update', new Date().toISOString().substring(11, 19) + ' UTC');
+        }
+
+        function formatUptime(seconds) {
+            const days = Math.floor(seconds / 86400);
+            const clock = new Date((seconds % 86400) * 1000).toISOString().substring(11, 19);
+            return days ? days + 'd ' + clock : clock;
+        }
+
+        function pollStatus() {
+            fetch('/api/status').then(function (r) { return r.json(); }).then(function (status) {
+                text('system-status', status.status === 'operational' ? '● ACTIVE' : '○ ' + status.status.toUpperCase());
+                if (status.status !== 'operational') return;
+                text('uptime', formatUptime(status.uptime_seconds));
+                text('api-requests', status.requests);
+                text('api-p99', status.p99_ms.toFixed(1) + ' ms');
+                text('api-in-flight', status.in_flight);
+                text('detection-queue', status.detection_queue);
+            }).catch(function () { text('system-status', '○ OFFLINE'); });
+        }
+        pollStatus();
+        setInterval(pollStatus, 5000);
+
+        const feed = new EventSource('{{ api_url }}/api/stream');
+        feed.onopen = function () { text('feed-status', 'LIVE'); };
+        feed.onerror = function () { text('feed-status', 'RECONNECTING'); };
+        feed.addEventListener('snapshot', function (e) { renderStatus(JSON.parse(e.data)); log('Live feed connected', 'log-info'); });
+        feed.addEventListener('status', function (e) { const updates = JSON.parse(e.data); renderStatus(updates[updates.length - 1]); });
+        feed.addEventListener('signal', function (e) {
+            const signals = JSON.parse(e.data);
+            if (signals.length > 3) log(signals.length + ' signals received', 'log-info');
+            else signals.forEach(function (s) { log('Signal ' + s.signal_type.toUpperCase() + ' at ' + s.location + ' (' + s.strength + ')', 'log-info'); });
+        });
+        feed.addEventListener('threat', function (e) {
+            JSON.parse(e.data).forEach(function (t) {
+                log(t.threat_level.toUpperCase() + ': ' + t.signal_type.toUpperCase() + ' threat at ' + t.location, t.threat_level === 'critical' || t.threat_level === 'high' ? 'log-critical' : 'log-warning');
+            });
+        });
+        feed.addEventListener('mitigation', function (e) {
+            JSON.parse(e.data).forEach(function (m) { log('Mitigation applied to ' + m.signal_type.toUpperCase() + ' threat ' + m.threat_id.substring(0, 8), 'log-info'); });
+        });
+        feed.addEventListener('resync', function (e) { log('Feed skipped ' + JSON.parse(e.data).dropped + ' events under load', 'log-warning'); });
     </script>
 </body>
 </html>
@@ -179,30 +257,46 @@ DASHBOARD_HTML = """
 
 @app.route('/')
 def dashboard():
-    return render_template_string(DASHBOARD_HTML)
+    return render_template_string(DASHBOARD_HTML, api_url=API_URL)
+
+def fetch_api(path, timeout=2.0):
+    """JSON from the API at ``path``; ``None`` if it cannot be reached."""
+    try:
+        with urlopen(f"{API_URL}{path}", timeout=timeout) as response:
+            return json.load(response)
+    except (URLError, OSError, ValueError):
+        return None
 
 @app.route('/api/status')
 def api_status():
+    status = {'service': 'WhiteKnight Threat Analysis API', 'version': '1.0.0', 'timestamp': datetime.now(timezone.utc).isoformat()}
+    health = fetch_api('/health')
+    if health is None:
+        return jsonify({**status, 'status': 'unreachable'}), 503
     return jsonify({
-        'service': 'WhiteKnight Threat Analysis API',
-        'status': 'operational',
-        'ai_model': 'Perplexity Sonar',
-        'version': '1.0.0',
-        'timestamp': datetime.now().isoformat(),
-        'uptime': '99.8%',
-        'threats_detected': 12487,
-        'false_positive_rate': 0.3
+        **status,
+        'status': 'operational' if health.get('status') == 'healthy' else health.get('status', 'unknown'),
+        'uptime_seconds': health['uptime_seconds'],
+        'threats_detected': health['stores']['threats'],
+        'signals_tracked': health['stores']['signals'],
+        'requests': health['requests'],
+        'errors': health['errors'],
+        'in_flight': health['in_flight'],
+        'p50_ms': health['p50_ms'],
+        'p99_ms': health['p99_ms'],
+        'detection_queue': health['pipeline']['queue_depth'],
+        'worker': health['worker']
     })
 
 @app.route('/api/threats')
 def api_threats():
-    return jsonify({
-        'active_threats': [
-            {'id': 1, 'severity': 'CRITICAL', 'title': 'Suspicious Network Activity', 'description': 'Unusual data exfiltration detected on port 443', 'timestamp': datetime.now().isoformat()},
-            {'id': 2, 'severity': 'WARNING', 'title': 'Brute Force Attempt', 'description': 'Multiple failed SSH login attempts from 192.168.1.x', 'timestamp': datetime.now().isoformat()},
-            {'id': 3, 'severity': 'INFO', 'title': 'Policy Violation', 'description': 'Unauthorized application detected on workstation', 'timestamp': datetime.now().isoformat()}
-        ]
-    })
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+    level = request.args.get('threat_level')
+    after = request.args.get('after')
+    body = fetch_api(f"/api/threats?status=detected&limit={limit}" + (f"&threat_level={quote(level)}" if level else '') + (f"&after={quote(after)}" if after else ''))
+    if body is None:
+        return jsonify({'active_threats': [], 'status': 'unreachable'}), 503
+    return jsonify({'active_threats': body['threats'], 'next_cursor': body.get('next_cursor')})
 
 if __name__ == '__main__':
     print("╔════════════════════════════════════════════════════════╗")
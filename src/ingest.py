@@ -0,0 +1,50 @@
+"""Bulk ingest parsing"""
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from starlette.requests import Request
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def describe_error(exc: Exception) -> str:
+    """One-line description of a parse or validation error for bulk acknowledgements."""
+    errors = getattr(exc, "errors", None)
+    if callable(errors):
+        first = errors()[0]
+        return f"{'.'.join(str(part) for part in first['loc'])}: {first['msg']}"
+    return str(exc)
+
+
+async def iter_records(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield ``(index, record)`` from a JSON array body or a streamed NDJSON body.
+
+    NDJSON lines are decoded as they arrive so the body is never held in
+    memory; a line that fails to decode is yielded as its exception.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in NDJSON_TYPES:
+        records = json.loads(await request.body())
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON array of signals")
+        for index, record in enumerate(records):
+            yield index, record
+        return
+    index = 0
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _decode(line)
+                index += 1
+    if pending.strip():
+        yield index, _decode(pending)
+
+
+def _decode(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return exc
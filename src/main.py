@@ -1,9 +1,24 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Optional, List
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Optional, List, Tuple
 import uuid
-from datetime import datetime
+from modules.detection import LEVEL_RANK, DetectionPipeline, SourceClusters
+from modules.monitoring import MetricsMiddleware, RequestMetrics, SamplingProfiler
+from modules.storage import DashboardAggregates, EvidenceStore, IndexedStore, RetentionPolicy, SignalRecord, SpatioTemporalIndex, ThreatRecord, geohash_encode, open_backend, parse_coordinates, parse_epoch_ms, to_utc, utc_now
+from modules.threat_intelligence import RecommendationEngine
+from modules.visualization import LiveFeed
+from src.config import PROJECT_ROOT, load_config, resolve_path
+from src.ingest import describe_error, iter_records
+from src.threat_detector import ThreatDetector
 
 class CaseData(BaseModel):
     title: str
@@ -11,23 +26,350 @@ class CaseData(BaseModel):
     investigator: str
     priority: Optional[str] = "medium"
 
+class BulkRecommendRequest(BaseModel):
+    threat_ids: List[str]
+
 class ThreatSignal(BaseModel):
     signal_type: str
     location: str
     strength: int
     timestamp: Optional[str] = None
     source_id: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    fingerprint: Optional[str] = None
+
+    @field_validator("timestamp")
+    @classmethod
+    def timestamp_in_utc(cls, value: Optional[str]) -> Optional[str]:
+        return to_utc(value) if value else None
+
+config = load_config()
+backend = open_backend(config["database"], root=PROJECT_ROOT)
+cases_db = IndexedStore("case_id", indexes=("status", "priority"), backend=backend, table="cases")
+threats_db = IndexedStore("threat_id", indexes=("threat_level", "case_id", "status"), backend=backend, table="threats")
+signals_db = IndexedStore("signal_id", indexes=("signal_type", "case_id", "location", "source_id"), backend=backend, table="signals")
+recommendations_db = IndexedStore("recommendation_id", indexes=("threat_id",), backend=backend, table="recommendations")
+aggregates = DashboardAggregates()
+spatial_index = SpatioTemporalIndex(precision=config["spatial_index"].get("geohash_precision", 6))
+source_clusters = SourceClusters(window_ms=config["source_clusters"].get("window_ms", 300000), co_occurrence_threshold=config["source_clusters"].get("co_occurrence_threshold", 3), max_recent=config["source_clusters"].get("max_recent", 32), pair_ttl_ms=config["source_clusters"].get("pair_ttl_ms", 86400000), max_pairs=config["source_clusters"].get("max_pairs", 100000))
+live_feed = LiveFeed(max_buffer=config["live_feed"].get("max_buffer", 256), heartbeat=config["live_feed"].get("heartbeat_seconds", 15))
+evidence_store = EvidenceStore(resolve_path(config["evidence"]["root"]))
+recommendation_engine = RecommendationEngine.from_yaml(resolve_path(config["threat_intelligence"]["playbooks"]))
+detector = ThreatDetector(window=config["detection"].get("window", "5min"))
+DETECTION_CONTEXT = config["detection"].get("context_size", 500)
+retention = RetentionPolicy.from_config(config["retention"], resolve_path(config["retention"]["archive_root"]))
+logger = logging.getLogger(__name__)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+SHARED_STATE = backend is not None and backend.shared
+sync_seq = backend.last_change() if SHARED_STATE else 0
+MONITORING = config["monitoring"]
+request_metrics = RequestMetrics()
+profiler = SamplingProfiler(interval=MONITORING["profiler"].get("interval_ms", 10) / 1000, all_threads=MONITORING["profiler"].get("all_threads", False))
+
+def store_sizes() -> dict:
+    return {"cases": len(cases_db), "signals": len(signals_db), "threats": len(threats_db), "recommendations": len(recommendations_db), "spatial_index": len(spatial_index), "sources": len(source_clusters)}
+
+def has_auto_source(signal: dict) -> bool:
+    """Signals posted without a source get a per-signal id that says nothing about the emitter."""
+    return signal["source_id"] == f"source_{signal['signal_id'][:8]}"
+
+def index_signal(signal: dict, restoring: bool = False):
+    epoch_ms = parse_epoch_ms(signal["timestamp"])
+    retention.add_signal(signal, epoch_ms, restoring)
+    place = signal["location"].strip().lower()
+    if signal.get("latitude") is not None and signal.get("longitude") is not None:
+        spatial_index.add(signal["signal_id"], signal["latitude"], signal["longitude"], epoch_ms)
+        place = geohash_encode(signal["latitude"], signal["longitude"], spatial_index.precision)
+    source_id = signal["source_id"]
+    if has_auto_source(signal):
+        if not signal.get("fingerprint"):
+            return
+        source_id = f"fingerprint:{signal['signal_type']}:{signal['fingerprint']}"
+    source_clusters.observe(source_id, signal["signal_type"], place, epoch_ms, signal["case_id"], signal.get("fingerprint"))
+
+def restore_state():
+    if backend is None:
+        return
+    retention.load_rollups(rollup for _, rollup in backend.load("rollups"))
+    cases_db.load(case for _, case in backend.load("cases"))
+    for case in cases_db.values():
+        case["evidence"] = []
+    for columns, evidence in backend.load("evidence"):
+        if columns["case_id"] in cases_db:
+            cases_db[columns["case_id"]]["evidence"].append(evidence)
+    signals_db.load(SignalRecord(signal) for _, signal in backend.load("signals"))
+    for signal in signals_db.values():
+        aggregates.record_signal(signal)
+        index_signal(signal, restoring=True)
+    threats_db.load(ThreatRecord(threat) for _, threat in backend.load("threats"))
+    for threat in threats_db.values():
+        aggregates.record_threat(threat)
+        retention.add_threat(threat, parse_epoch_ms(threat["detected_at"]), restoring=True)
+    recommendations_db.load(rec for _, rec in backend.load("recommendations"))
+
+restore_state()
+
+def apply_change(table: str, record_id: str, columns: Optional[dict], record: Optional[dict]):
+    """Fold a row written by any worker into this worker's view; applying a change twice is harmless."""
+    if table == "cases":
+        if record is None:
+            if record_id in cases_db:
+                cases_db.unload([record_id])
+                aggregates.drop_case(record_id)
+        elif record_id in cases_db:
+            cases_db.merge(record_id, record)
+        else:
+            cases_db.load([{**record, "evidence": []}])
+    elif table == "evidence":
+        if record is not None and columns["case_id"] in cases_db:
+            evidence = cases_db[columns["case_id"]]["evidence"]
+            if all(item["evidence_id"] != record_id for item in evidence):
+                evidence.append(record)
+    elif table == "signals":
+        if record is None:
+            if record_id in signals_db:
+                aggregates.forget_signal(signals_db[record_id])
+            signals_db.unload([record_id])
+            spatial_index.discard(record_id)
+        elif record_id not in signals_db:
+            signal = SignalRecord(record)
+            signals_db.load([signal])
+            aggregates.record_signal(signal)
+            index_signal(signal)
+            live_feed.publish("signal", signal)
+    elif table == "threats":
+        if record is None:
+            if record_id in threats_db:
+                aggregates.forget_threat(threats_db[record_id])
+            threats_db.unload([record_id])
+        elif record_id in threats_db:
+            threat = threats_db.merge(record_id, record)
+            if threat["mitigation_applied"]:
+                aggregates.record_mitigation(threat)
+        else:
+            threat = ThreatRecord(record)
+            threats_db.load([threat])
+            aggregates.record_threat(threat)
+            retention.add_threat(threat, parse_epoch_ms(threat["detected_at"]))
+            live_feed.publish("threat", threat)
+    elif table == "recommendations":
+        if record is None:
+            recommendations_db.unload([record_id])
+        elif record_id in recommendations_db:
+            recommendations_db.merge(record_id, record)
+        else:
+            recommendations_db.load([record])
+    elif table == "rollups" and record is not None:
+        retention.load_rollups([record])
+
+async def lookup(table: str, store: IndexedStore, record_id: str):
+    """A record from this worker's view or, in shared mode, the committed row of a record another worker wrote that has not synced here yet."""
+    if record_id in store:
+        return store[record_id]
+    if not SHARED_STATE:
+        return None
+    loop = asyncio.get_running_loop()
+    row = await loop.run_in_executor(None, backend.fetch, table, record_id)
+    if row is None:
+        return None
+    apply_change(table, record_id, *row)
+    if table == "cases":
+        for columns, evidence in await loop.run_in_executor(None, backend.fetch_where, "evidence", "case_id", record_id):
+            apply_change("evidence", evidence["evidence_id"], columns, evidence)
+    return store.get(record_id)
+
+async def committed():
+    """In shared mode, wait until this worker's writes so far are committed, so any worker serving the next request sees them."""
+    if SHARED_STATE:
+        await asyncio.get_running_loop().run_in_executor(None, backend.sync)
+
+def bump_case(case_id: Optional[str], field: str, amount: int = 1):
+    """Increment a case counter; in shared mode the SQL increment runs even if this worker has not seen the case yet."""
+    if not case_id:
+        return
+    if case_id in cases_db:
+        cases_db.increment(case_id, field, amount)
+    elif SHARED_STATE:
+        backend.increment("cases", case_id, field, amount)
+
+async def sync_loop(interval: float, change_log_seconds: float):
+    """Tail the shared change log so rows written by other workers show up here."""
+    global sync_seq
+    loop = asyncio.get_running_loop()
+    pruned_at = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            sync_seq, changes = await loop.run_in_executor(None, backend.changes_since, sync_seq)
+            for change in changes:
+                apply_change(*change)
+            retention.take_dirty()
+            if changes:
+                publish_status()
+            if time.monotonic() - pruned_at > change_log_seconds:
+                backend.prune_changes(change_log_seconds)
+                pruned_at = time.monotonic()
+        except Exception:
+            logger.exception("Shared state sync failed")
+
+def detection_context(batch: List[dict]) -> List[dict]:
+    context = {}
+    for location in {signal["location"] for signal in batch}:
+        context.update((s["signal_id"], s) for s in signals_db.recent("location", location, DETECTION_CONTEXT))
+    for source_id in {signal["source_id"] for signal in batch}:
+        context.update((s["signal_id"], s) for s in signals_db.recent("source_id", source_id, DETECTION_CONTEXT))
+    context.update((signal["signal_id"], signal) for signal in batch)
+    return list(context.values())
+
+OPEN_THREAT_LIMIT = 100000
+open_threats: OrderedDict = OrderedDict()
+
+def on_detected_threat(signal: dict, threat_level: str) -> bool:
+    """Raise a threat for a pipeline detection, or fold it into the open one; returns whether a threat was created.
+
+    Detections of the same source (or location, for sourceless signals) and
+    signal type within the detector window of the threat being raised bump
+    its ``signal_count`` instead of raising another threat, unless they are
+    of a higher level or the threat was mitigated. The window does not slide
+    with merges, so a source that keeps pinging raises a fresh threat once
+    per window. Only the ``OPEN_THREAT_LIMIT`` most recently raised threats
+    are tracked.
+    """
+    key = ("location", signal["location"].strip().lower(), signal["signal_type"]) if has_auto_source(signal) else ("source", signal["source_id"], signal["signal_type"])
+    epoch_ms = parse_epoch_ms(signal["timestamp"])
+    threat_id, opened_ms = open_threats.get(key, (None, 0))
+    threat = threats_db.get(threat_id) if threat_id else None
+    if threat is not None and not threat["mitigation_applied"] and abs(epoch_ms - opened_ms) <= detector.window_ms and LEVEL_RANK[threat_level] <= LEVEL_RANK[threat["threat_level"]]:
+        threats_db.increment(threat_id, "signal_count")
+        threats_db.update_fields(threat_id, last_seen_at=signal["timestamp"])
+        return False
+    threat = create_threat(signal, threat_level, signal["case_id"])
+    open_threats.pop(key, None)
+    open_threats[key] = (threat["threat_id"], epoch_ms)
+    if len(open_threats) > OPEN_THREAT_LIMIT:
+        open_threats.popitem(last=False)
+    if PIPELINE_SETTINGS.get("auto_recommend"):
+        create_recommendation(threat)
+    return True
 
-cases_db = {}
-threats_db = {}
-signals_db = {}
-recommendations_db = {}
+PIPELINE_SETTINGS = config["detection"].get("pipeline", {})
+pipeline = DetectionPipeline.from_config(PIPELINE_SETTINGS, detector, detection_context, on_detected_threat)
+
+RETENTION_SETTINGS = config["retention"]
+
+def save_rollups():
+    for rollup in retention.take_dirty():
+        if backend is not None:
+            backend.save("rollups", rollup)
+
+async def sweep_retention(now_ms: Optional[int] = None) -> Tuple[dict, int]:
+    """Archive expired partitions to gzip NDJSON, then drop their raw rows from memory and the database.
+
+    A partition whose archive cannot be written keeps its rows and is
+    retried on the next sweep. Returns rows archived per table and the
+    number of partitions that failed.
+    """
+    now_ms = now_ms or int(time.time() * 1000)
+    expired = {"signals": retention.expire("signals", now_ms), "threats": retention.expire("threats", now_ms, keep=lambda threat_id: threat_id in threats_db and not threats_db[threat_id]["mitigation_applied"])}
+    save_rollups()
+    loop = asyncio.get_running_loop()
+    archived, failed = {"signals": 0, "threats": 0}, 0
+    for table, partitions in expired.items():
+        for start, ids in partitions.items():
+            if table == "signals":
+                records = [signals_db[signal_id] for signal_id in ids if signal_id in signals_db]
+            else:
+                records = [{**threats_db[threat_id], "recommendations": recommendations_db.filter(threat_id=threat_id)} for threat_id in ids if threat_id in threats_db]
+            if records:
+                try:
+                    await loop.run_in_executor(None, retention.write_archive, table, start, records)
+                except OSError:
+                    logger.exception("Archiving %s partition %s failed; its rows stay hot until the next sweep", table, start)
+                    retention.reattach(table, start, ids)
+                    failed += 1
+                    continue
+            for record in records:
+                if table == "signals":
+                    aggregates.forget_signal(signals_db.pop(record["signal_id"]))
+                    spatial_index.discard(record["signal_id"])
+                else:
+                    aggregates.forget_threat(threats_db.pop(record["threat_id"]))
+                    for recommendation in record["recommendations"]:
+                        recommendations_db.pop(recommendation["recommendation_id"], None)
+            archived[table] += len(records)
+    save_rollups()
+    return archived, failed
+
+def holds_retention_lease(ttl: float) -> bool:
+    """Only one worker sweeps a shared database; the lease moves on if its holder stops renewing it."""
+    return not SHARED_STATE or backend.try_lease("retention", WORKER_ID, ttl)
+
+async def retention_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if holds_retention_lease(interval * 2):
+                await sweep_retention()
+        except Exception:
+            logger.exception("Retention sweep failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if PIPELINE_SETTINGS.get("enabled", True):
+        await pipeline.start()
+    sweeper = asyncio.create_task(retention_loop(RETENTION_SETTINGS.get("sweep_interval_seconds", 300))) if RETENTION_SETTINGS.get("enabled", True) else None
+    syncer = asyncio.create_task(sync_loop(config["database"].get("sync_interval_ms", 50) / 1000, config["database"].get("change_log_seconds", 600))) if SHARED_STATE else None
+    if MONITORING["profiler"].get("enabled"):
+        profiler.start()
+    yield
+    profiler.stop()
+    for task in (sweeper, syncer):
+        if task is not None:
+            task.cancel()
+    await pipeline.stop()
+    if backend is not None:
+        backend.flush()
 
 app = FastAPI(
     title="WhiteKnight Security Platform",
     description="Digital Forensics for Human Trafficking Investigation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(CORSMiddleware, allow_origins=config["live_feed"].get("cors_origins", []), allow_methods=["GET"])
+if MONITORING.get("metrics", True):
+    app.add_middleware(MetricsMiddleware, metrics=request_metrics, routes=app.routes)
+
+request_metrics.register("store_records", "Records held in memory, by store.", store_sizes, label="store")
+request_metrics.register("pipeline_queue_depth", "Signals waiting for threat detection.", lambda: pipeline.metrics()["queue_depth"])
+request_metrics.register("pipeline_processed_total", "Signals run through threat detection.", lambda: pipeline.processed, kind="counter")
+request_metrics.register("pipeline_lag_seconds", "Queueing delay of the last detection batch.", lambda: pipeline.last_lag)
+request_metrics.register("live_feed_subscribers", "Connected live dashboard clients.", lambda: len(live_feed.subscribers))
+request_metrics.register("retention_hot_partitions", "Partitions still holding raw rows, by table.", lambda: {table: len(partitions) for table, partitions in retention.members.items()}, label="table")
+request_metrics.register("worker_info", "Worker that answered the scrape; each uvicorn worker keeps its own metrics.", lambda: {WORKER_ID: 1}, label="worker")
+
+def publish_status():
+    if live_feed.subscribers:
+        live_feed.publish("status", aggregates.snapshot(), latest_only=True)
+
+MAX_PAGE_SIZE = 1000
+
+def project(records: List[dict], fields: Optional[str], omit: tuple = ()) -> List[dict]:
+    if fields:
+        keep = [field.strip() for field in fields.split(",") if field.strip() and field.strip() not in omit]
+        return [{field: record[field] for field in keep if field in record} for record in records]
+    if omit:
+        return [{key: value for key, value in record.items() if key not in omit} for record in records]
+    return [dict(record) for record in records]
+
+def time_bounds(start: Optional[str], end: Optional[str]) -> tuple:
+    """Epoch-ms query bounds; raises ValueError for values that are not ISO-8601."""
+    return (parse_epoch_ms(start, strict=True) if start else None, parse_epoch_ms(end, strict=True) if end else None)
+
+def invalid_cursor(after: str):
+    """Cursors are record ids, so one whose record was deleted or swept by retention can no longer be resumed from."""
+    return JSONResponse({"success": False, "message": f"Invalid cursor {after}: it does not match a stored record, which may have been deleted or archived; restart from the first page"}, status_code=400)
 
 @app.get("/")
 async def root():
@@ -35,172 +377,354 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return JSONResponse({"status": "healthy"})
+    return JSONResponse({"status": "healthy", "worker": WORKER_ID, **request_metrics.summary(), "stores": store_sizes(), "pipeline": {"running": pipeline.running, "queue_depth": pipeline.metrics()["queue_depth"], "lag_seconds": round(pipeline.last_lag, 6)}, "live_feed_subscribers": len(live_feed.subscribers)})
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/api/info")
 async def api_info():
-    return JSONResponse({"name": "WhiteKnight Security Platform", "version": "1.0.0", "endpoints": ["/", "/health", "/api/info", "/api/case", "/api/cases", "/api/cases/{case_id}", "/api/cases/{case_id}/evidence", "/api/threat", "/api/threats", "/api/signal", "/api/signals", "/api/ai/recommend", "/api/dashboard", "/docs", "/redoc"]})
+    return JSONResponse({"name": "WhiteKnight Security Platform", "version": "1.0.0", "endpoints": ["/", "/health", "/api/info", "/api/case", "/api/cases", "/api/cases/{case_id}", "/api/cases/{case_id}/evidence", "/api/cases/{case_id}/evidence/upload", "/api/cases/{case_id}/evidence/{evidence_id}/download", "/api/threat", "/api/threats", "/api/sources", "/api/sources/{source_id}", "/api/signal", "/api/signals", "/api/signals/bulk", "/api/signals/search", "/api/ai/recommend", "/api/ai/recommend/bulk", "/api/dashboard", "/api/trends", "/api/retention/sweep", "/api/pipeline", "/api/profiler", "/api/stream", "/metrics", "/docs", "/redoc"]})
 
 @app.post("/api/case")
 async def create_case(case_data: CaseData):
     case_id = str(uuid.uuid4())
-    case = {"case_id": case_id, "title": case_data.title, "description": case_data.description, "investigator": case_data.investigator, "priority": case_data.priority, "created_at": datetime.now().isoformat(), "status": "active", "evidence_count": 0, "evidence": [], "threats_detected": 0, "signals_tracked": 0}
+    case = {"case_id": case_id, "title": case_data.title, "description": case_data.description, "investigator": case_data.investigator, "priority": case_data.priority, "created_at": utc_now(), "status": "active", "evidence_count": 0, "evidence": [], "threats_detected": 0, "signals_tracked": 0}
     cases_db[case_id] = case
+    await committed()
     return JSONResponse({"success": True, "message": "Case created successfully", "case": case})
 
 @app.get("/api/cases/{case_id}")
 async def get_case(case_id: str):
-    if case_id not in cases_db:
+    case = await lookup("cases", cases_db, case_id)
+    if case is None:
         return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
-    return JSONResponse({"success": True, "case": cases_db[case_id]})
+    return JSONResponse({"success": True, "case": case})
 
 @app.get("/api/cases")
-async def list_cases():
-    return JSONResponse({"success": True, "total_cases": len(cases_db), "cases": list(cases_db.values())})
+async def list_cases(limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None, include_evidence: bool = True):
+    try:
+        cases, next_cursor = cases_db.page(limit, after)
+    except KeyError:
+        return invalid_cursor(after)
+    return JSONResponse({"success": True, "total_cases": len(cases_db), "cases": project(cases, fields, () if include_evidence else ("evidence",)), "next_cursor": next_cursor})
 
 @app.post("/api/cases/{case_id}/evidence")
 async def add_evidence(case_id: str, evidence_data: dict):
+    case = await lookup("cases", cases_db, case_id)
+    if case is None:
+        return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
+    evidence = {"evidence_id": str(uuid.uuid4()), "data": evidence_data, "added_at": utc_now()}
+    case["evidence"].append(evidence)
+    evidence_count = cases_db.increment(case_id, "evidence_count")
+    if backend is not None:
+        backend.save("evidence", evidence, case_id=case_id)
+    await committed()
+    return JSONResponse({"success": True, "message": "Evidence added successfully", "case_id": case_id, "evidence_count": evidence_count})
+
+@app.post("/api/cases/{case_id}/evidence/upload")
+async def upload_evidence(case_id: str, request: Request, filename: Optional[str] = None):
+    if await lookup("cases", cases_db, case_id) is None:
+        return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
+    artifact = await evidence_store.write_stream(request.stream())
     if case_id not in cases_db:
         return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
-    cases_db[case_id]["evidence_count"] += 1
-    cases_db[case_id]["evidence"].append({"evidence_id": str(uuid.uuid4()), "data": evidence_data, "added_at": datetime.now().isoformat()})
-    return JSONResponse({"success": True, "message": "Evidence added successfully", "case_id": case_id, "evidence_count": cases_db[case_id]["evidence_count"]})
+    case = cases_db[case_id]
+    for evidence in case["evidence"]:
+        if evidence.get("artifact", {}).get("sha256") == artifact.sha256:
+            return JSONResponse({"success": True, "message": "Evidence already attached", "case_id": case_id, "evidence": evidence, "deduplicated": True, "evidence_count": case["evidence_count"]})
+    evidence = {"evidence_id": str(uuid.uuid4()), "artifact": {"sha256": artifact.sha256, "size": artifact.size, "filename": filename, "content_type": request.headers.get("content-type", "application/octet-stream")}, "added_at": utc_now()}
+    case["evidence"].append(evidence)
+    evidence_count = cases_db.increment(case_id, "evidence_count")
+    if backend is not None:
+        backend.save("evidence", evidence, case_id=case_id)
+    await committed()
+    return JSONResponse({"success": True, "message": "Evidence uploaded successfully", "case_id": case_id, "evidence": evidence, "deduplicated": artifact.deduplicated, "evidence_count": evidence_count})
+
+@app.get("/api/cases/{case_id}/evidence/{evidence_id}/download")
+async def download_evidence(case_id: str, evidence_id: str):
+    case = await lookup("cases", cases_db, case_id)
+    if case is None:
+        return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
+    evidence = next((e for e in case["evidence"] if e["evidence_id"] == evidence_id), None)
+    if evidence is None or "artifact" not in evidence or not evidence_store.exists(evidence["artifact"]["sha256"]):
+        return JSONResponse({"success": False, "message": f"Evidence artifact {evidence_id} not found"}, status_code=404)
+    artifact = evidence["artifact"]
+    return FileResponse(evidence_store.path(artifact["sha256"]), media_type=artifact["content_type"], filename=artifact["filename"] or artifact["sha256"], headers={"X-Content-SHA256": artifact["sha256"]})
 
 @app.put("/api/cases/{case_id}")
 async def update_case(case_id: str, case_data: CaseData):
-    if case_id not in cases_db:
+    if await lookup("cases", cases_db, case_id) is None:
         return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
-    cases_db[case_id].update({"title": case_data.title, "description": case_data.description, "investigator": case_data.investigator, "priority": case_data.priority})
-    return JSONResponse({"success": True, "message": "Case updated successfully", "case": cases_db[case_id]})
+    case = cases_db.update_fields(case_id, title=case_data.title, description=case_data.description, investigator=case_data.investigator, priority=case_data.priority)
+    await committed()
+    return JSONResponse({"success": True, "message": "Case updated successfully", "case": case})
 
 @app.delete("/api/cases/{case_id}")
 async def delete_case(case_id: str):
-    if case_id not in cases_db:
+    if await lookup("cases", cases_db, case_id) is None:
         return JSONResponse({"success": False, "message": f"Case {case_id} not found"}, status_code=404)
     deleted_case = cases_db.pop(case_id)
+    aggregates.drop_case(case_id)
+    if backend is not None:
+        backend.delete_where("evidence", "case_id", case_id)
+    await committed()
     return JSONResponse({"success": True, "message": "Case deleted successfully", "case": deleted_case})
 
+def build_signal_entry(signal: ThreatSignal, case_id: Optional[str], now: str) -> SignalRecord:
+    signal_id = str(uuid.uuid4())
+    coordinates = (signal.latitude, signal.longitude) if signal.latitude is not None and signal.longitude is not None else parse_coordinates(signal.location)
+    latitude, longitude = coordinates or (None, None)
+    return SignalRecord({"signal_id": signal_id, "signal_type": signal.signal_type, "location": signal.location, "strength": signal.strength, "source_id": signal.source_id or f"source_{signal_id[:8]}", "timestamp": signal.timestamp or now, "case_id": case_id, "latitude": latitude, "longitude": longitude, "fingerprint": signal.fingerprint})
+
+def store_signals(entries: List[SignalRecord], case_id: Optional[str]):
+    for entry in entries:
+        signals_db[entry["signal_id"]] = entry
+        aggregates.record_signal(entry)
+        index_signal(entry)
+        live_feed.publish("signal", entry)
+    if retention.dirty:
+        save_rollups()
+    if entries:
+        bump_case(case_id, "signals_tracked", len(entries))
+    publish_status()
+
 @app.post("/api/signal")
 async def log_signal(signal: ThreatSignal, case_id: Optional[str] = None):
-    signal_id = str(uuid.uuid4())
-    timestamp = signal.timestamp or datetime.now().isoformat()
-    signal_entry = {"signal_id": signal_id, "signal_type": signal.signal_type, "location": signal.location, "strength": signal.strength, "source_id": signal.source_id or f"source_{signal_id[:8]}", "timestamp": timestamp, "case_id": case_id}
-    signals_db[signal_id] = signal_entry
-    if case_id and case_id in cases_db:
-        cases_db[case_id]["signals_tracked"] += 1
-    return JSONResponse({"success": True, "message": f"Signal logged: {signal.signal_type}", "signal": signal_entry})
+    signal_entry = build_signal_entry(signal, case_id, utc_now())
+    store_signals([signal_entry], case_id)
+    await pipeline.submit(signal_entry)
+    await committed()
+    return JSONResponse({"success": True, "message": f"Signal logged: {signal.signal_type}", "signal": dict(signal_entry)})
+
+@app.post("/api/signals/bulk")
+async def log_signals_bulk(request: Request, case_id: Optional[str] = None, batch_size: int = 1000):
+    batch_size = max(1, batch_size)
+    batches, errors, rejected = [], [], 0
+    pending: List[ThreatSignal] = []
+
+    async def flush():
+        now = utc_now()
+        entries = [build_signal_entry(signal, case_id, now) for signal in pending]
+        store_signals(entries, case_id)
+        await pipeline.submit_many(entries)
+        batches.append({"batch": len(batches), "accepted": len(entries), "first_signal_id": entries[0]["signal_id"], "last_signal_id": entries[-1]["signal_id"]})
+        pending.clear()
+
+    try:
+        async for index, record in iter_records(request):
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                pending.append(ThreatSignal(**record))
+            except (ValidationError, ValueError, TypeError) as exc:
+                rejected += 1
+                if len(errors) < 100:
+                    errors.append({"index": index, "error": describe_error(exc)})
+                continue
+            if len(pending) >= batch_size:
+                await flush()
+    except ValueError as exc:
+        return JSONResponse({"success": False, "message": f"Invalid bulk payload: {exc}", "batches": batches}, status_code=400)
+    if pending:
+        await flush()
+    accepted = sum(batch["accepted"] for batch in batches)
+    await committed()
+    return JSONResponse({"success": rejected == 0, "message": f"Signals logged: {accepted}", "accepted": accepted, "rejected": rejected, "batches": batches, "errors": errors})
 
 @app.get("/api/signals")
-async def list_signals(signal_type: Optional[str] = None, case_id: Optional[str] = None):
-    filtered_signals = list(signals_db.values())
+async def list_signals(signal_type: Optional[str] = None, case_id: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    criteria = {"signal_type": signal_type or None, "case_id": case_id or None}
+    try:
+        signals, next_cursor = signals_db.page(limit, after, **criteria)
+    except KeyError:
+        return invalid_cursor(after)
+    total = len(signals) if limit is None and after is None else signals_db.count(**criteria)
+    return JSONResponse({"success": True, "total_signals": total, "signals": project(signals, fields), "next_cursor": next_cursor})
+
+@app.get("/api/signals/search")
+async def search_signals(min_lat: Optional[float] = Query(None, ge=-90, le=90), min_lon: Optional[float] = Query(None, ge=-180, le=180), max_lat: Optional[float] = Query(None, ge=-90, le=90), max_lon: Optional[float] = Query(None, ge=-180, le=180), lat: Optional[float] = Query(None, ge=-90, le=90), lon: Optional[float] = Query(None, ge=-180, le=180), radius_km: Optional[float] = Query(None, gt=0), start: Optional[str] = None, end: Optional[str] = None, signal_type: Optional[str] = None, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), fields: Optional[str] = None):
+    try:
+        start_ms, end_ms = time_bounds(start, end)
+    except ValueError as exc:
+        return JSONResponse({"success": False, "message": str(exc)}, status_code=400)
+    if None not in (lat, lon, radius_km):
+        matches = spatial_index.search_radius(lat, lon, radius_km, start_ms, end_ms)
+    elif None not in (min_lat, min_lon, max_lat, max_lon) and min_lat <= max_lat and min_lon <= max_lon:
+        matches = spatial_index.search_bbox(min_lat, min_lon, max_lat, max_lon, start_ms, end_ms)
+    else:
+        return JSONResponse({"success": False, "message": "Provide min_lat/min_lon/max_lat/max_lon or lat/lon/radius_km"}, status_code=400)
+    signals = [signals_db[signal_id] for _, signal_id in matches if signal_id in signals_db]
     if signal_type:
-        filtered_signals = [s for s in filtered_signals if s["signal_type"] == signal_type]
-    if case_id:
-        filtered_signals = [s for s in filtered_signals if s["case_id"] == case_id]
-    return JSONResponse({"success": True, "total_signals": len(filtered_signals), "signals": filtered_signals})
+        signals = [signal for signal in signals if signal["signal_type"] == signal_type]
+    return JSONResponse({"success": True, "total_signals": len(signals), "signals": project(signals[:limit], fields), "truncated": len(signals) > limit})
 
 @app.get("/api/signals/{signal_id}")
 async def get_signal(signal_id: str):
-    if signal_id not in signals_db:
+    signal = await lookup("signals", signals_db, signal_id)
+    if signal is None:
         return JSONResponse({"success": False, "message": f"Signal {signal_id} not found"}, status_code=404)
-    return JSONResponse({"success": True, "signal": signals_db[signal_id]})
+    return JSONResponse({"success": True, "signal": dict(signal)})
 
-@app.post("/api/threat")
-async def detect_threat(signal_id: str, threat_level: str = "medium", case_id: Optional[str] = None):
-    if signal_id not in signals_db:
-        return JSONResponse({"success": False, "message": f"Signal {signal_id} not found"}, status_code=404)
+def score_signal(signal: dict) -> str:
+    return detector.classify(detection_context([signal]), [signal["signal_id"]])[0]
+
+def create_threat(signal: SignalRecord, threat_level: str, case_id: Optional[str]) -> ThreatRecord:
     threat_id = str(uuid.uuid4())
-    signal = signals_db[signal_id]
-    threat_entry = {"threat_id": threat_id, "signal_id": signal_id, "threat_level": threat_level, "signal_type": signal["signal_type"], "location": signal["location"], "detected_at": datetime.now().isoformat(), "case_id": case_id, "status": "detected", "ai_recommendations": [], "mitigation_applied": False}
+    threat_entry = ThreatRecord({"threat_id": threat_id, "signal_id": signal["signal_id"], "threat_level": threat_level, "signal_type": signal["signal_type"], "location": signal["location"], "detected_at": utc_now(), "case_id": case_id})
     threats_db[threat_id] = threat_entry
-    if case_id and case_id in cases_db:
-        cases_db[case_id]["threats_detected"] += 1
-    return JSONResponse({"success": True, "message": f"Threat detected: {threat_level}", "threat": threat_entry})
+    aggregates.record_threat(threat_entry)
+    retention.add_threat(threat_entry, parse_epoch_ms(threat_entry["detected_at"]))
+    if retention.dirty:
+        save_rollups()
+    bump_case(case_id, "threats_detected")
+    live_feed.publish("threat", threat_entry)
+    publish_status()
+    return threat_entry
+
+@app.post("/api/threat")
+async def detect_threat(signal_id: str, threat_level: Optional[str] = None, case_id: Optional[str] = None):
+    signal = await lookup("signals", signals_db, signal_id)
+    if signal is None:
+        return JSONResponse({"success": False, "message": f"Signal {signal_id} not found"}, status_code=404)
+    if threat_level is None:
+        threat_level = score_signal(signal)
+    threat_entry = create_threat(signal, threat_level, case_id)
+    await committed()
+    return JSONResponse({"success": True, "message": f"Threat detected: {threat_level}", "threat": dict(threat_entry)})
 
 @app.get("/api/threats")
-async def list_threats(threat_level: Optional[str] = None, case_id: Optional[str] = None):
-    filtered_threats = list(threats_db.values())
-    if threat_level:
-        filtered_threats = [t for t in filtered_threats if t["threat_level"] == threat_level]
-    if case_id:
-        filtered_threats = [t for t in filtered_threats if t["case_id"] == case_id]
-    return JSONResponse({"success": True, "total_threats": len(filtered_threats), "threats": filtered_threats})
+async def list_threats(threat_level: Optional[str] = None, case_id: Optional[str] = None, status: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    criteria = {"threat_level": threat_level or None, "case_id": case_id or None, "status": status or None}
+    try:
+        threats, next_cursor = threats_db.page(limit, after, **criteria)
+    except KeyError:
+        return invalid_cursor(after)
+    total = len(threats) if limit is None and after is None else threats_db.count(**criteria)
+    return JSONResponse({"success": True, "total_threats": total, "threats": project(threats, fields), "next_cursor": next_cursor})
+
+@app.get("/api/sources")
+async def list_linked_sources():
+    clusters = source_clusters.cross_case()
+    return JSONResponse({"success": True, "total_clusters": len(clusters), "clusters": clusters})
+
+@app.get("/api/sources/{source_id}")
+async def get_source(source_id: str):
+    cluster = source_clusters.cluster(source_id)
+    if cluster is None:
+        return JSONResponse({"success": False, "message": f"Source {source_id} not found"}, status_code=404)
+    return JSONResponse({"success": True, "source_id": source_id, "cluster": cluster})
 
 @app.get("/api/threats/{threat_id}")
 async def get_threat(threat_id: str):
-    if threat_id not in threats_db:
+    threat = await lookup("threats", threats_db, threat_id)
+    if threat is None:
         return JSONResponse({"success": False, "message": f"Threat {threat_id} not found"}, status_code=404)
-    return JSONResponse({"success": True, "threat": threats_db[threat_id]})
-
-def get_mitigation_commands(signal_type: str, threat_level: str) -> List[str]:
-    commands = {
-        "ble": {"critical": ["sudo hcitool down", "sudo bluetoothctl power off", "iwconfig wlan0 power off", "sudo iptables -P INPUT DROP", "alert_law_enforcement()"], "high": ["sudo hcitool reset", "sudo bluetoothctl disconnect all", "enable_network_monitoring()"], "medium": ["sudo hcitool scan --flush", "enable_logging()"], "low": ["log_signal()"]},
-        "cell": {"critical": ["sudo airplane_mode_on()", "sudo disable_2g_3g_4g()", "alert_fcc_enforcement()", "enable_gps_logging()"], "high": ["sudo disable_4g()", "enable_cell_monitoring()"], "medium": ["enable_signal_strength_monitoring()"], "low": ["monitor_cell_activity()"]},
-        "wifi": {"critical": ["sudo iwconfig wlan0 txpower off", "sudo iptables -P INPUT DROP", "disable_auto_connect()", "alert_network_security()"], "high": ["sudo iwconfig wlan0 mode managed", "disconnect_all_networks()"], "medium": ["enable_wifi_monitoring()"], "low": ["monitor_wifi_networks()"]},
-        "cell_tower": {"critical": ["sudo gpsd stop", "disable_location_services()", "alert_fbi_field_office()"], "high": ["reduce_location_accuracy()"], "medium": ["monitor_tower_locations()"], "low": ["track_tower_changes()"]}
-    }
-    return commands.get(signal_type, {}).get(threat_level, ["log_signal()"])
-
-def get_threat_analysis(signal_type: str, threat_level: str) -> str:
-    analysis = {"ble": "BLE signal detected. Unauthorized pairing device or tracking beacon.", "cell": "Cellular signal anomaly. IMSI catcher or unauthorized network access.", "wifi": "WiFi network anomaly. Man-in-the-middle attack or rogue access point.", "cell_tower": "Cell tower signal pattern. Possible location tracking or surveillance."}
-    threat_context = {"critical": "IMMEDIATE ACTION REQUIRED", "high": "URGENT action needed", "medium": "ELEVATED monitoring", "low": "INFORMATIONAL"}
-    return f"{analysis.get(signal_type, 'Unknown signal')} - {threat_context.get(threat_level, '')}"
-
-def get_recommended_action(threat_level: str) -> str:
-    actions = {"critical": "LOCKDOWN: Disable all wireless, enable GPS logging, contact law enforcement", "high": "ISOLATE: Disable systems, begin detailed logging, contact incident response", "medium": "MONITOR: Increase logging, alert supervisor", "low": "LOG: Maintain standard monitoring"}
-    return actions.get(threat_level, "Monitor and log")
+    return JSONResponse({"success": True, "threat": dict(threat)})
+
+def create_recommendation(threat: ThreatRecord, generated_at: Optional[str] = None) -> dict:
+    threat_id = threat["threat_id"]
+    template = recommendation_engine.template(threat["signal_type"], threat["threat_level"])
+    recommendation_id = str(uuid.uuid4())
+    recommendation = {"recommendation_id": recommendation_id, "threat_id": threat_id, "threat_level": template.threat_level, "threat_description": template.threat_description, "ai_analysis": template.ai_analysis, "mitigation_commands": list(template.mitigation_commands), "recommended_action": template.recommended_action, "generated_at": generated_at or utc_now(), "status": "pending"}
+    recommendations_db[recommendation_id] = recommendation
+    threats_db.update_fields(threat_id, ai_recommendations=(*threat["ai_recommendations"], recommendation_id))
+    return recommendation
 
 @app.post("/api/ai/recommend")
 async def ai_recommend(threat_id: str):
-    if threat_id not in threats_db:
+    threat = await lookup("threats", threats_db, threat_id)
+    if threat is None:
         return JSONResponse({"success": False, "message": f"Threat {threat_id} not found"}, status_code=404)
-    threat = threats_db[threat_id]
-    signal_type = threat["signal_type"]
-    threat_level = threat["threat_level"]
-    mitigation_commands = get_mitigation_commands(signal_type, threat_level)
-    ai_analysis = get_threat_analysis(signal_type, threat_level)
-    recommended_action = get_recommended_action(threat_level)
-    recommendation_id = str(uuid.uuid4())
-    recommendation = {"recommendation_id": recommendation_id, "threat_id": threat_id, "threat_level": threat_level, "threat_description": f"{signal_type.upper()} threat", "ai_analysis": ai_analysis, "mitigation_commands": mitigation_commands, "recommended_action": recommended_action, "generated_at": datetime.now().isoformat(), "status": "pending"}
-    recommendations_db[recommendation_id] = recommendation
-    threat["ai_recommendations"].append(recommendation_id)
+    recommendation = create_recommendation(threat)
+    await committed()
     return JSONResponse({"success": True, "message": "AI recommendation generated", "recommendation": recommendation})
 
+@app.post("/api/ai/recommend/bulk")
+async def ai_recommend_bulk(request: BulkRecommendRequest):
+    generated_at = utc_now()
+    recommendations, not_found = [], []
+    for threat_id in request.threat_ids:
+        threat = await lookup("threats", threats_db, threat_id)
+        if threat is not None:
+            recommendations.append(create_recommendation(threat, generated_at))
+        else:
+            not_found.append(threat_id)
+    await committed()
+    return JSONResponse({"success": not not_found, "message": f"AI recommendations generated: {len(recommendations)}", "total_recommendations": len(recommendations), "recommendations": recommendations, "not_found": not_found})
+
 @app.get("/api/ai/recommendations")
-async def list_recommendations(threat_id: Optional[str] = None):
-    filtered_recs = list(recommendations_db.values())
-    if threat_id:
-        filtered_recs = [r for r in filtered_recs if r["threat_id"] == threat_id]
-    return JSONResponse({"success": True, "total_recommendations": len(filtered_recs), "recommendations": filtered_recs})
+async def list_recommendations(threat_id: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = None):
+    try:
+        recs, next_cursor = recommendations_db.page(limit, after, threat_id=threat_id or None)
+    except KeyError:
+        return invalid_cursor(after)
+    total = len(recs) if limit is None and after is None else recommendations_db.count(threat_id=threat_id or None)
+    return JSONResponse({"success": True, "total_recommendations": total, "recommendations": project(recs, fields), "next_cursor": next_cursor})
 
 @app.post("/api/ai/recommendations/{recommendation_id}/apply")
 async def apply_mitigation(recommendation_id: str):
-    if recommendation_id not in recommendations_db:
+    rec = await lookup("recommendations", recommendations_db, recommendation_id)
+    if rec is None or await lookup("threats", threats_db, rec["threat_id"]) is None:
         return JSONResponse({"success": False, "message": f"Recommendation {recommendation_id} not found"}, status_code=404)
-    rec = recommendations_db[recommendation_id]
     threat_id = rec["threat_id"]
-    rec["status"] = "applied"
-    threats_db[threat_id]["mitigation_applied"] = True
-    threats_db[threat_id]["status"] = "mitigated"
+    recommendations_db.update_fields(recommendation_id, status="applied")
+    threat = threats_db.update_fields(threat_id, mitigation_applied=True, status="mitigated")
+    aggregates.record_mitigation(threat)
+    live_feed.publish("mitigation", {"threat_id": threat_id, "recommendation_id": recommendation_id, "threat_level": threat["threat_level"], "signal_type": threat["signal_type"], "status": threat["status"]})
+    publish_status()
+    await committed()
     return JSONResponse({"success": True, "message": "Mitigation applied", "recommendation": rec, "commands_executed": rec["mitigation_commands"]})
 
+@app.get("/api/trends")
+async def get_trends(start: Optional[str] = None, end: Optional[str] = None, include_locations: bool = False):
+    try:
+        start_ms, end_ms = time_bounds(start, end)
+    except ValueError as exc:
+        return JSONResponse({"success": False, "message": str(exc)}, status_code=400)
+    partitions = retention.trends(start_ms, end_ms, include_locations)
+    return JSONResponse({"success": True, "partition": retention.partition, "total_signals": sum(p["signals"] for p in partitions), "total_threats": sum(p["threats"] for p in partitions), "partitions": partitions})
+
+@app.post("/api/retention/sweep")
+async def run_retention_sweep():
+    if not holds_retention_lease(RETENTION_SETTINGS.get("sweep_interval_seconds", 300) * 2):
+        return JSONResponse({"success": False, "message": "Retention is being swept by another worker"}, status_code=409)
+    archived, failed = await sweep_retention()
+    if failed:
+        return JSONResponse({"success": False, "message": f"Archiving {failed} partition(s) failed; their rows stay hot and are retried on the next sweep", "archived": archived, "keep_partitions": retention.keep_partitions}, status_code=500)
+    return JSONResponse({"success": True, "archived": archived, "keep_partitions": retention.keep_partitions})
+
+@app.get("/api/pipeline")
+async def pipeline_status():
+    return JSONResponse({"success": True, "pipeline": pipeline.metrics()})
+
+@app.get("/api/profiler")
+async def profiler_report(limit: int = Query(20, ge=1, le=1000), collapsed: bool = False):
+    if collapsed:
+        return PlainTextResponse(profiler.collapsed())
+    return JSONResponse({"success": True, "worker": WORKER_ID, "profiler": profiler.status(), "top": profiler.top(limit)})
+
+@app.post("/api/profiler")
+async def toggle_profiler(enabled: bool, interval_ms: Optional[float] = Query(None, gt=0), all_threads: Optional[bool] = None):
+    if enabled:
+        profiler.start(interval_ms / 1000 if interval_ms else None, all_threads)
+    else:
+        profiler.stop()
+    return JSONResponse({"success": True, "worker": WORKER_ID, "profiler": profiler.status()})
+
+@app.get("/api/stream")
+async def live_stream(request: Request):
+    return StreamingResponse(live_feed.stream(request.is_disconnected, aggregates.snapshot), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/api/dashboard")
 async def get_dashboard(case_id: Optional[str] = None):
-    case_data = None
-    if case_id and case_id in cases_db:
-        case_data = cases_db[case_id]
-    total_signals = len(signals_db)
-    total_threats = len(threats_db)
-    threat_levels = {"critical": len([t for t in threats_db.values() if t["threat_level"] == "critical"]), "high": len([t for t in threats_db.values() if t["threat_level"] == "high"]), "medium": len([t for t in threats_db.values() if t["threat_level"] == "medium"]), "low": len([t for t in threats_db.values() if t["threat_level"] == "low"])}
-    signal_breakdown = {}
-    for signal in signals_db.values():
-        sig_type = signal["signal_type"]
-        signal_breakdown[sig_type] = signal_breakdown.get(sig_type, 0) + 1
-    mitigated = len([t for t in threats_db.values() if t["mitigation_applied"]])
-    active = total_threats - mitigated
-    dashboard = {"timestamp": datetime.now().isoformat(), "case": case_data, "real_time_status": {"total_signals_detected": total_signals, "total_threats": total_threats, "active_threats": active, "mitigated_threats": mitigated}, "threat_analysis": {"by_level": threat_levels, "critical_count": threat_levels["critical"], "high_count": threat_levels["high"]}, "signal_landscape": {"by_type": signal_breakdown, "ble_signals": signal_breakdown.get("ble", 0), "cell_signals": signal_breakdown.get("cell", 0), "wifi_signals": signal_breakdown.get("wifi", 0), "cell_tower_signals": signal_breakdown.get("cell_tower", 0)}, "recent_signals": list(signals_db.values())[-5:], "active_threats": [t for t in threats_db.values() if not t["mitigation_applied"]][:5]}
+    case_data = await lookup("cases", cases_db, case_id) if case_id else None
+    dashboard = {"timestamp": utc_now(), "case": case_data, **aggregates.snapshot()}
+    if case_data is not None:
+        dashboard["case_rollup"] = aggregates.case_rollup(case_id)
     return JSONResponse({"success": True, "dashboard": dashboard})
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("src.main:app", host=config["dashboard"].get("host", "0.0.0.0"), port=config["dashboard"].get("port", 8000), workers=config["server"]["workers"])
@@ -1,3 +1,112 @@
 """Detector"""
+from typing import Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+THREAT_LEVELS = np.array(["low", "medium", "high", "critical"], dtype=object)
+CO_OCCURRENCE_TYPES = ("ble", "cell", "wifi", "cell_tower")
+COLUMNS = ["signal_id", "signal_type", "location", "strength", "source_id", "timestamp"]
+
+
+def _window_starts(codes: np.ndarray, times: np.ndarray, window: int):
+    """Sort rows by (group, time) and return, for each sorted row, the first row of its window.
+
+    Groups and times are folded into one int64 key so a single vectorized
+    ``searchsorted`` finds every window start at once.
+    """
+    order = np.lexsort((times, codes))
+    offset = times.min()
+    span = int(times.max() - offset) + window + 1
+    key = codes[order].astype(np.int64) * span + (times[order] - offset)
+    return order, np.searchsorted(key, key - window, side="left")
+
+
 class ThreatDetector:
-    pass
+    """Vectorized threat scoring over sliding time windows.
+
+    Every signal in a batch is scored from three features computed over the
+    trailing ``window`` of signals that share its location or source:
+
+    * ``strength_z`` - z-score of its strength against the location window
+    * ``burst_rate`` - signals per minute from the same ``source_id``
+    * ``co_occurrence`` - distinct BLE/cell/WiFi/tower types at the location
+
+    Co-occurrence is corroborating evidence only: its weight is scaled by
+    the stronger of the other two features, so radios merely coexisting at a
+    place never raise a score on their own. The weighted score is bucketed
+    into low/medium/high/critical by ``thresholds``, which sit above the
+    largest contribution of any single feature.
+    """
+
+    def __init__(self, window: str = "5min", burst_reference: float = 6.0, weights=(0.4, 0.35, 0.25), thresholds=(0.45, 0.65, 0.85)):
+        self.window_ms = int(pd.Timedelta(window).total_seconds() * 1000)
+        self.burst_reference = burst_reference
+        self.weights = np.asarray(weights, dtype=float)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+
+    def to_frame(self, signals: Union[pd.DataFrame, Iterable[Mapping]]) -> pd.DataFrame:
+        if isinstance(signals, pd.DataFrame):
+            return signals.reset_index(drop=True)
+        signals = list(signals)
+        return pd.DataFrame({column: [signal[column] for signal in signals] for column in COLUMNS})
+
+    def _epoch_ms(self, timestamps: pd.Series) -> np.ndarray:
+        if pd.api.types.is_integer_dtype(timestamps.dtype):
+            return timestamps.to_numpy(dtype=np.int64)
+        parsed = pd.to_datetime(timestamps, errors="coerce", utc=True, format="ISO8601")
+        parsed = parsed.fillna(pd.Timestamp.now(tz="UTC"))
+        return parsed.to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+    def score(self, signals: Union[pd.DataFrame, Iterable[Mapping]]) -> pd.DataFrame:
+        """Score a batch; returns one row per input signal, in input order.
+
+        ``timestamp`` may hold ISO strings or integer epoch milliseconds.
+        """
+        frame = self.to_frame(signals)
+        n = len(frame)
+        if n == 0:
+            return pd.DataFrame({"signal_id": [], "strength_z": [], "burst_rate": [], "co_occurrence": [], "score": [], "threat_level": []})
+        times = self._epoch_ms(frame["timestamp"])
+        strength = frame["strength"].to_numpy(dtype=float)
+        location_codes = pd.factorize(frame["location"])[0]
+        source_codes = pd.factorize(frame["source_id"].fillna(frame["signal_id"]))[0]
+        ends = np.arange(1, n + 1)
+
+        order, start = _window_starts(location_codes, times, self.window_ms)
+        counts = ends - start
+        sorted_strength = strength[order]
+        sums = np.concatenate(([0.0], np.cumsum(sorted_strength)))
+        squares = np.concatenate(([0.0], np.cumsum(sorted_strength ** 2)))
+        mean = (sums[ends] - sums[start]) / counts
+        std = np.sqrt(np.maximum((squares[ends] - squares[start]) / counts - mean ** 2, 0.0))
+        strength_z = np.empty(n)
+        strength_z[order] = np.divide(sorted_strength - mean, std, out=np.zeros(n), where=std > 1e-9)
+
+        sorted_types = pd.Categorical(frame["signal_type"], categories=CO_OCCURRENCE_TYPES).codes[order]
+        present = np.zeros(n, dtype=np.int64)
+        for type_code in range(len(CO_OCCURRENCE_TYPES)):
+            seen = np.concatenate(([0], np.cumsum(sorted_types == type_code)))
+            present += (seen[ends] - seen[start]) > 0
+        co_occurrence = np.empty(n, dtype=np.int64)
+        co_occurrence[order] = present
+
+        order, start = _window_starts(source_codes, times, self.window_ms)
+        burst_rate = np.empty(n)
+        burst_rate[order] = (ends - start) / (self.window_ms / 60000.0)
+
+        strength_feature = np.clip(strength_z, 0.0, 3.0) / 3.0
+        burst_feature = np.minimum(burst_rate / self.burst_reference, 1.0)
+        co_occurrence_feature = np.maximum(co_occurrence - 1, 0) / (len(CO_OCCURRENCE_TYPES) - 1) * np.maximum(strength_feature, burst_feature)
+        features = np.column_stack([strength_feature, burst_feature, co_occurrence_feature])
+        score = features @ self.weights
+        threat_level = THREAT_LEVELS[np.searchsorted(self.thresholds, score, side="right")]
+        return pd.DataFrame({"signal_id": frame["signal_id"].to_numpy(), "strength_z": strength_z, "burst_rate": burst_rate, "co_occurrence": co_occurrence, "score": score, "threat_level": threat_level})
+
+    def classify(self, signals: Iterable[Mapping], target_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """Return threat levels for ``target_ids`` (default: every signal) scored within ``signals``."""
+        scored = self.score(signals)
+        if target_ids is None:
+            return scored["threat_level"].tolist()
+        levels = dict(zip(scored["signal_id"], scored["threat_level"]))
+        return [levels[signal_id] for signal_id in target_ids]
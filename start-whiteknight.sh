@@ -1,8 +1,11 @@
 #!/bin/bash
 # Detect if src.main:app exists and start FastAPI
 if [ -f "src/main.py" ]; then
-    echo "Starting FastAPI server..."
-    uvicorn src.main:app --host=0.0.0.0 --port=8000
+    # More than one worker switches the API to shared SQLite state (see config/default.yaml);
+    # extra workers add read throughput, not ingest throughput (see benchmarks/multi_worker.py)
+    WORKERS="${WHITEKNIGHT_WORKERS:-1}"
+    echo "Starting FastAPI server with ${WORKERS} worker(s)..."
+    WHITEKNIGHT_WORKERS="${WORKERS}" uvicorn src.main:app --host=0.0.0.0 --port=8000 --workers="${WORKERS}"
 elif [ -f "app.py" ]; then
     echo "Starting Flask app..."
     flask --app=app run --host=0.0.0.0 --port=5000
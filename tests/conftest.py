@@ -1,2 +1,7 @@
 """Pytest"""
-pass
+import os
+import tempfile
+
+os.environ.setdefault("WHITEKNIGHT_DATABASE_URL", "sqlite://")
+os.environ.setdefault("WHITEKNIGHT_EVIDENCE_ROOT", tempfile.mkdtemp(prefix="whiteknight-evidence-"))
+os.environ.setdefault("WHITEKNIGHT_ARCHIVE_ROOT", tempfile.mkdtemp(prefix="whiteknight-archive-"))
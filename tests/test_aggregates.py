@@ -0,0 +1,21 @@
+from modules.storage import DashboardAggregates
+
+
+def test_snapshot_tracks_signals_threats_and_mitigations():
+    agg = DashboardAggregates(recent_size=2)
+    for i, sig_type in enumerate(["ble", "wifi", "ble"]):
+        agg.record_signal({"signal_id": str(i), "signal_type": sig_type, "case_id": "c1"})
+    threat = {"threat_id": "t1", "threat_level": "critical", "case_id": "c1", "mitigation_applied": False}
+    agg.record_threat(threat)
+    agg.record_threat({"threat_id": "t2", "threat_level": "low", "case_id": None, "mitigation_applied": False})
+    agg.record_mitigation(threat)
+    agg.record_mitigation(threat)
+    snap = agg.snapshot()
+    assert snap["real_time_status"] == {"total_signals_detected": 3, "total_threats": 2, "active_threats": 1, "mitigated_threats": 1}
+    assert snap["signal_landscape"]["ble_signals"] == 2
+    assert [s["signal_id"] for s in snap["recent_signals"]] == ["1", "2"]
+    assert [t["threat_id"] for t in snap["active_threats"]] == ["t2"]
+    assert agg.case_rollup("c1")["by_level"]["critical"] == 1
+    assert agg.case_rollup("c1")["mitigated"] == 1
+    agg.drop_case("c1")
+    assert agg.case_rollup("c1")["signals"] == 0
@@ -0,0 +1,30 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from src.main import app, cases_db, signals_db
+
+client = TestClient(app)
+
+
+def test_bulk_json_array_updates_case_once_per_batch():
+    case_id = client.post("/api/case", json={"title": "t", "description": "d", "investigator": "i"}).json()["case"]["case_id"]
+    signals = [{"signal_type": "ble", "location": "dock", "strength": -40 - i} for i in range(5)]
+    body = client.post(f"/api/signals/bulk?case_id={case_id}&batch_size=2", json=signals).json()
+    assert body["accepted"] == 5 and body["rejected"] == 0
+    assert [batch["accepted"] for batch in body["batches"]] == [2, 2, 1]
+    assert cases_db[case_id]["signals_tracked"] == 5
+    assert signals_db[body["batches"][0]["first_signal_id"]]["strength"] == -40
+
+
+def test_bulk_ndjson_reports_bad_lines():
+    lines = [json.dumps({"signal_type": "wifi", "location": "lot", "strength": -70}), "{not json", json.dumps({"signal_type": "cell"})]
+    response = client.post("/api/signals/bulk", content="\n".join(lines) + "\n", headers={"content-type": "application/x-ndjson"})
+    body = response.json()
+    assert body["accepted"] == 1 and body["rejected"] == 2
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+
+
+def test_bulk_rejects_non_array_json():
+    response = client.post("/api/signals/bulk", json={"signal_type": "ble"})
+    assert response.status_code == 400
@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+
+from src import dashboard
+from src.main import app
+
+
+def test_threats_route_lists_only_active_threats(monkeypatch):
+    api = TestClient(app)
+    monkeypatch.setattr(dashboard, "fetch_api", lambda path, timeout=2.0: api.get(path).json())
+    signal_id = api.post("/api/signal", json={"signal_type": "wifi", "location": "Depot", "strength": -45}).json()["signal"]["signal_id"]
+    active, mitigated = (api.post(f"/api/threat?signal_id={signal_id}&threat_level=high").json()["threat"]["threat_id"] for _ in range(2))
+    recommendation = api.post(f"/api/ai/recommend?threat_id={mitigated}").json()["recommendation"]["recommendation_id"]
+    api.post(f"/api/ai/recommendations/{recommendation}/apply")
+    assert api.get("/api/threats?status=mitigated&limit=1000").json()["threats"][-1]["threat_id"] == mitigated
+    listed = [threat["threat_id"] for threat in dashboard.app.test_client().get("/api/threats?limit=1000").get_json()["active_threats"]]
+    assert active in listed and mitigated not in listed
+
+
+def test_status_route_reports_api_health(monkeypatch):
+    api = TestClient(app)
+    monkeypatch.setattr(dashboard, "fetch_api", lambda path, timeout=2.0: api.get(path).json())
+    body = dashboard.app.test_client().get("/api/status").get_json()
+    assert body["status"] == "operational" and body["signals_tracked"] == api.get("/health").json()["stores"]["signals"]
+    monkeypatch.setattr(dashboard, "fetch_api", lambda path, timeout=2.0: None)
+    response = dashboard.app.test_client().get("/api/status")
+    assert response.status_code == 503 and response.get_json()["status"] == "unreachable"
+    assert dashboard.app.test_client().get("/api/threats").status_code == 503
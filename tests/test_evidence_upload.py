@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+
+from src.main import app, evidence_store
+
+client = TestClient(app)
+
+
+def new_case():
+    return client.post("/api/case", json={"title": "t", "description": "d", "investigator": "i"}).json()["case"]["case_id"]
+
+
+def test_upload_is_content_addressed_and_deduplicated():
+    payload = b"pcap" * 100000
+    first, second = new_case(), new_case()
+    body = client.post(f"/api/cases/{first}/evidence/upload?filename=dump.pcap", content=payload, headers={"content-type": "application/vnd.tcpdump.pcap"}).json()
+    sha256 = body["evidence"]["artifact"]["sha256"]
+    assert body["evidence"]["artifact"]["size"] == len(payload)
+    assert evidence_store.exists(sha256)
+    again = client.post(f"/api/cases/{second}/evidence/upload", content=payload).json()
+    assert again["deduplicated"] and again["evidence"]["artifact"]["sha256"] == sha256
+    repeat = client.post(f"/api/cases/{first}/evidence/upload", content=payload).json()
+    assert repeat["evidence"]["evidence_id"] == body["evidence"]["evidence_id"] and repeat["evidence_count"] == 1
+
+    download = client.get(f"/api/cases/{first}/evidence/{body['evidence']['evidence_id']}/download")
+    assert download.status_code == 200 and download.content == payload
+    assert download.headers["x-content-sha256"] == sha256
+    assert client.get(f"/api/cases/{second}/evidence/{body['evidence']['evidence_id']}/download").status_code == 404
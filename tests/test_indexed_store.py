@@ -0,0 +1,50 @@
+from modules.storage import IndexedStore
+
+
+def make_store():
+    store = IndexedStore("signal_id", indexes=("signal_type", "case_id"))
+    store["a"] = {"signal_id": "a", "signal_type": "ble", "case_id": "c1"}
+    store["b"] = {"signal_id": "b", "signal_type": "wifi", "case_id": "c1"}
+    store["c"] = {"signal_id": "c", "signal_type": "ble", "case_id": "c2"}
+    return store
+
+
+def test_filter_intersects_indexes_in_insertion_order():
+    store = make_store()
+    assert [s["signal_id"] for s in store.filter(signal_type="ble")] == ["a", "c"]
+    assert [s["signal_id"] for s in store.filter(signal_type="ble", case_id="c2")] == ["c"]
+    assert store.filter(signal_type="cell") == []
+    assert len(store.filter(signal_type=None)) == 3
+    assert store.count(signal_type="ble") == 2
+
+
+def test_indexes_follow_updates_and_deletes():
+    store = make_store()
+    store.update_fields("a", signal_type="cell")
+    assert store.count(signal_type="cell") == 1
+    assert [s["signal_id"] for s in store.filter(signal_type="ble")] == ["c"]
+    del store["c"]
+    assert store.filter(signal_type="ble") == []
+    assert "ble" not in store.indexes["signal_type"]
+    store["b"] = {"signal_id": "b", "signal_type": "ble", "case_id": "c3"}
+    assert store.filter(case_id="c1") == [store["a"]]
+
+
+def test_pages_resume_after_cursor():
+    store = make_store()
+    store["d"] = {"signal_id": "d", "signal_type": "ble", "case_id": "c1"}
+    page, cursor = store.page(1, None, signal_type="ble")
+    assert [s["signal_id"] for s in page] == ["a"] and cursor == "a"
+    page, cursor = store.page(1, cursor, signal_type="ble")
+    assert [s["signal_id"] for s in page] == ["c"] and cursor == "c"
+    page, cursor = store.page(1, cursor, signal_type="ble")
+    assert [s["signal_id"] for s in page] == ["d"] and cursor is None
+    assert store.page_ids(2, "a", case_id="c1") == (["b", "d"], None)
+    del store["b"]
+    assert store.page_ids(5, None) == (["a", "c", "d"], None)
+    try:
+        store.page(1, "b")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("stale cursor accepted")
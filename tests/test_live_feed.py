@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from modules.visualization import LiveFeed
+
+
+def parse(message):
+    event, data = message.strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_events_are_coalesced_per_client():
+    async def scenario():
+        feed = LiveFeed(max_buffer=3)
+        feed.publish("signal", {"n": 0})
+        client = feed.subscribe()
+        for n in range(1, 5):
+            feed.publish("signal", {"n": n})
+            feed.publish("status", {"total": n}, latest_only=True)
+        feed.publish("threat", {"level": "high"})
+        assert await client.wait(0.01)
+        messages = [parse(m) for m in client.drain()]
+        feed.unsubscribe(client)
+        return messages, await client.wait(0.01)
+
+    messages, ready = asyncio.run(scenario())
+    assert messages[0] == ("resync", {"dropped": 2})
+    assert messages[1:] == [("signal", [{"n": 3}, {"n": 4}]), ("threat", [{"level": "high"}]), ("status", [{"total": 4}])]
+    assert not ready
+
+
+def test_stream_sends_snapshot_then_updates():
+    async def scenario():
+        feed = LiveFeed(heartbeat=0.01)
+        disconnected = []
+
+        async def is_disconnected():
+            return len(disconnected) > 0
+
+        stream = feed.stream(is_disconnected, lambda: {"total": 0})
+        first = await stream.__anext__()
+        feed.publish("signal", {"n": 1})
+        second = await stream.__anext__()
+        disconnected.append(True)
+        await stream.aclose()
+        return first, second, len(feed.subscribers)
+
+    first, second, subscribers = asyncio.run(scenario())
+    assert parse(first) == ("snapshot", {"total": 0})
+    assert parse(second) == ("signal", [{"n": 1}])
+    assert subscribers == 0
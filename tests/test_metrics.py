@@ -0,0 +1,46 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from modules.monitoring import Histogram, SamplingProfiler
+from src.main import app, request_metrics
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((1, 2, 4))
+    for value in (0.5, 1, 1.5, 3, 9):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.quantile(1.0) == 4
+    assert histogram.render("x", {"route": "/a"})[-3:] == ['x_bucket{route="/a",le="+Inf"} 5', 'x_sum{route="/a"} 15.0', 'x_count{route="/a"} 5']
+
+
+def test_requests_are_labelled_by_route_template():
+    case_id = client.post("/api/case", json={"title": "t", "description": "d", "investigator": "i"}).json()["case"]["case_id"]
+    client.get(f"/api/cases/{case_id}")
+    client.get("/no/such/path")
+    assert request_metrics.latency[("GET", "/api/cases/{case_id}")].count >= 1
+    assert request_metrics.responses[("GET", "unmatched", 404)] >= 1
+    assert request_metrics.request_bytes[("POST", "/api/case")].sum > 0
+
+    text = client.get("/metrics").text
+    assert 'whiteknight_http_request_duration_seconds_count{method="GET",route="/api/cases/{case_id}"}' in text
+    assert "# TYPE whiteknight_http_response_size_bytes histogram" in text
+    assert 'whiteknight_store_records{store="cases"}' in text
+    health = client.get("/health").json()
+    assert health["status"] == "healthy" and health["stores"]["cases"] >= 1 and health["requests"] >= 3
+
+
+def test_profiler_toggles_at_runtime():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.sample()
+    assert profiler.samples == 1 and profiler.top(1)[0]["stack"].endswith("test_metrics.py:test_profiler_toggles_at_runtime;profiler.py:sample")
+
+    assert client.post("/api/profiler?enabled=true&interval_ms=1").json()["profiler"]["running"]
+    time.sleep(0.05)
+    body = client.post("/api/profiler?enabled=false").json()
+    assert not body["profiler"]["running"] and body["profiler"]["samples"] > 0
+    assert client.get("/api/profiler?collapsed=true").text.strip()
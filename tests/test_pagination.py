@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+client = TestClient(app)
+
+
+def test_list_signals_paginates_and_projects():
+    case_id = client.post("/api/case", json={"title": "t", "description": "d", "investigator": "i"}).json()["case"]["case_id"]
+    client.post(f"/api/signals/bulk?case_id={case_id}", json=[{"signal_type": "ble", "location": "pier", "strength": -i} for i in range(5)])
+    seen, after = [], None
+    while True:
+        query = f"/api/signals?case_id={case_id}&limit=2&fields=signal_id,strength" + (f"&after={after}" if after else "")
+        body = client.get(query).json()
+        assert body["total_signals"] == 5
+        assert all(set(signal) == {"signal_id", "strength"} for signal in body["signals"])
+        seen += [signal["strength"] for signal in body["signals"]]
+        after = body["next_cursor"]
+        if after is None:
+            break
+    assert seen == [0, -1, -2, -3, -4]
+    first = client.get(f"/api/signals?case_id={case_id}&limit=1").json()["next_cursor"]
+    assert client.get(f"/api/signals?case_id={case_id}&after={first}").json()["total_signals"] == 5
+    assert client.get("/api/signals?after=missing").status_code == 400
+    assert client.get("/api/signals?limit=0").status_code == 422
+
+
+def test_list_cases_can_omit_evidence():
+    case_id = client.post("/api/case", json={"title": "t", "description": "d", "investigator": "i"}).json()["case"]["case_id"]
+    client.post(f"/api/cases/{case_id}/evidence", json={"note": "x"})
+    cases = client.get("/api/cases?include_evidence=false").json()["cases"]
+    assert all("evidence" not in case for case in cases)
+    assert any(case["evidence_count"] == 1 for case in cases)
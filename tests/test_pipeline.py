@@ -0,0 +1,72 @@
+import asyncio
+
+from modules.detection import DetectionPipeline
+
+
+class FixedDetector:
+    def __init__(self):
+        self.batches = []
+
+    def classify(self, signals, target_ids):
+        self.batches.append(list(target_ids))
+        return ["critical" if signal_id.startswith("hot") else "low" for signal_id in target_ids]
+
+
+def test_pipeline_batches_signals_and_creates_threats():
+    detector = FixedDetector()
+    threats = []
+    pipeline = DetectionPipeline(detector, lambda batch: batch, lambda signal, level: threats.append((signal["signal_id"], level)), max_queue=4, batch_size=3, linger=0.01)
+
+    async def scenario():
+        await pipeline.submit({"signal_id": "ignored"})
+        await pipeline.start()
+        await pipeline.submit_many({"signal_id": signal_id} for signal_id in ["hot-1", "cold-1", "cold-2", "hot-2", "cold-3"])
+        await pipeline.drain()
+        metrics = pipeline.metrics()
+        await pipeline.stop()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert threats == [("hot-1", "critical"), ("hot-2", "critical")]
+    assert all(len(batch) <= 3 for batch in detector.batches)
+    assert sum(len(batch) for batch in detector.batches) == 5
+    assert metrics["processed"] == 5 and metrics["threats_created"] == 2 and metrics["queue_depth"] == 0
+    assert not pipeline.running
+
+
+def test_repeat_detections_bump_the_open_threat():
+    from src.main import ThreatSignal, build_signal_entry, on_detected_threat, signals_db, store_signals, threats_db
+
+    def signal(minute, source_id="dev-chatty", signal_type="ble"):
+        payload = ThreatSignal(signal_type=signal_type, location="pier", strength=-40, source_id=source_id, timestamp=f"2026-02-01T00:{minute:02d}:00")
+        entry = build_signal_entry(payload, None, payload.timestamp)
+        store_signals([entry], None)
+        return signals_db[entry["signal_id"]]
+
+    created = [on_detected_threat(signal(minute), "high") for minute in range(4)]
+    assert created == [True, False, False, False]
+    threats = [threat for threat in threats_db.values() if threat["location"] == "pier"]
+    assert len(threats) == 1 and threats[0]["signal_count"] == 4 and threats[0]["last_seen_at"] == "2026-02-01T00:03:00"
+    assert on_detected_threat(signal(4), "critical")
+    assert on_detected_threat(signal(4, source_id="dev-other"), "high")
+    assert on_detected_threat(signal(4, signal_type="wifi"), "high")
+    assert on_detected_threat(signal(30), "high")
+
+
+def test_mitigated_threats_and_long_running_sources_raise_new_threats():
+    from src.main import ThreatSignal, build_signal_entry, on_detected_threat, signals_db, store_signals, threats_db
+
+    def signal(minute, source_id="dev-pinger"):
+        payload = ThreatSignal(signal_type="cell", location="harbor", strength=-40, source_id=source_id, timestamp=f"2026-03-01T00:{minute:02d}:00")
+        entry = build_signal_entry(payload, None, payload.timestamp)
+        store_signals([entry], None)
+        return signals_db[entry["signal_id"]]
+
+    first = signal(0, "dev-mitigated")
+    assert on_detected_threat(first, "high")
+    mitigated = next(threat for threat in threats_db.values() if threat["signal_id"] == first["signal_id"])
+    threats_db.update_fields(mitigated["threat_id"], mitigation_applied=True, status="mitigated")
+    assert on_detected_threat(signal(1, "dev-mitigated"), "high")
+    assert not on_detected_threat(signal(2, "dev-mitigated"), "high")
+    assert threats_db[mitigated["threat_id"]]["signal_count"] == 1
+    assert [on_detected_threat(signal(minute), "high") for minute in range(12)] == [True] + [False] * 5 + [True] + [False] * 5
@@ -0,0 +1,22 @@
+from modules.threat_intelligence import RecommendationEngine
+from src.config import resolve_path
+
+engine = RecommendationEngine.from_yaml(resolve_path("config/playbooks.yaml"))
+
+
+def test_templates_are_precomputed_from_playbooks():
+    template = engine.template("ble", "critical")
+    assert template is engine.template("ble", "critical")
+    assert template.threat_description == "BLE threat"
+    assert template.ai_analysis == "BLE signal detected. Unauthorized pairing device or tracking beacon. - IMMEDIATE ACTION REQUIRED"
+    assert template.mitigation_commands[-1] == "alert_law_enforcement()"
+    assert template.recommended_action.startswith("LOCKDOWN")
+    assert len(engine.templates) == 16
+
+
+def test_unknown_combinations_fall_back_and_are_cached():
+    template = engine.template("lora", "severe")
+    assert template is engine.template("lora", "severe")
+    assert template.mitigation_commands == ("log_signal()",)
+    assert template.ai_analysis == "Unknown signal - "
+    assert template.recommended_action == "Monitor and log"
@@ -0,0 +1,22 @@
+import json
+
+from modules.storage import IndexedStore, SignalRecord, ThreatRecord
+
+
+def test_signal_record_reads_like_a_dict():
+    payload = json.loads('{"signal_id": "s1", "signal_type": "wifi", "location": "Pier 9", "strength": -40, "source_id": "dev-1", "timestamp": "2026-03-01T10:00:00.250000", "case_id": null}')
+    record = SignalRecord(payload)
+    assert type(record.timestamp) is int and record["timestamp"] == "2026-03-01T10:00:00.250000"
+    assert record["location"] is SignalRecord(json.loads('{"location": "Pier 9"}'))["location"]
+    assert dict(record) == {**payload, "latitude": None, "longitude": None, "fingerprint": None}
+    assert record.get("missing", 1) == 1 and "signal_type" in record and "missing" not in record
+    assert SignalRecord({"timestamp": "2026-03-01T10:00:00+02:00"})["timestamp"] == "2026-03-01T10:00:00+02:00"
+
+
+def test_threat_record_in_indexed_store():
+    store = IndexedStore("threat_id", indexes=("threat_level",))
+    store["t1"] = ThreatRecord({"threat_id": "t1", "signal_id": "s1", "threat_level": "high", "signal_type": "ble", "location": "Dock", "detected_at": "2026-03-01T10:00:00"})
+    assert store["t1"]["status"] == "detected" and store["t1"]["ai_recommendations"] == ()
+    store.update_fields("t1", threat_level="critical", ai_recommendations=("r1",), mitigation_applied=True)
+    assert store.ids(threat_level="critical") == ["t1"] and store.count(threat_level="high") == 0
+    assert json.loads(json.dumps(dict(store["t1"])))["ai_recommendations"] == ["r1"]
@@ -0,0 +1,68 @@
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+from modules.storage import RetentionPolicy
+from src.main import app
+
+HOUR = 3600 * 1000
+
+
+def test_partitions_roll_up_and_expire(tmp_path):
+    policy = RetentionPolicy(str(tmp_path), partition="hourly", keep_partitions=2)
+    policy.add_signal({"signal_id": "s1", "signal_type": "ble", "location": "Dock"}, 10 * HOUR + 5)
+    policy.add_signal({"signal_id": "s2", "signal_type": "ble", "location": "Pier"}, 10 * HOUR + 9)
+    policy.add_threat({"threat_id": "t1", "threat_level": "high"}, 10 * HOUR + 9)
+    policy.add_signal({"signal_id": "s3", "signal_type": "wifi", "location": "Dock"}, 12 * HOUR)
+    assert policy.expire("signals", 12 * HOUR) == {}
+    assert policy.expire("signals", 13 * HOUR) == {10 * HOUR: ["s1", "s2"]}
+    assert policy.expire("threats", 13 * HOUR, keep=lambda threat_id: True) == {10 * HOUR: []}
+    assert policy.members["threats"] == {10 * HOUR: ["t1"]}
+    assert [rollup["partition_start"] for rollup in policy.take_dirty()] == [10 * HOUR]
+    trends = policy.trends(include_locations=True)
+    assert [(p["archived"], p["signals"], p["threats"]) for p in trends] == [(False, 2, 1), (False, 1, 0)]
+    assert trends[0]["signal_types"] == {"ble": 2} and trends[0]["locations"] == {"Dock": 1, "Pier": 1}
+    assert policy.expire("threats", 13 * HOUR) == {10 * HOUR: ["t1"]} and policy.trends()[0]["archived"] is True
+    restored = RetentionPolicy(str(tmp_path), partition="hourly", keep_partitions=2)
+    restored.load_rollups(policy.take_dirty())
+    restored.add_threat({"threat_id": "t1", "threat_level": "high"}, 10 * HOUR + 9, restoring=True)
+    assert [(p["archived"], p["threats"]) for p in restored.trends()] == [(False, 1)]
+    restored.expire("threats", 13 * HOUR)
+    restored.reattach("threats", 10 * HOUR, ["t1"])
+    assert restored.members["threats"] == {10 * HOUR: ["t1"]} and restored.trends()[0]["archived"] is False
+    path = policy.write_archive("signals", 10 * HOUR, [{"signal_id": "s1"}])
+    policy.write_archive("signals", 10 * HOUR, [{"signal_id": "s2"}])
+    with gzip.open(path, "rt") as fh:
+        assert [json.loads(line)["signal_id"] for line in fh] == ["s1", "s2"]
+
+
+def test_sweep_endpoint_archives_old_signals_and_keeps_trends():
+    client = TestClient(app)
+    old = client.post("/api/signal", json={"signal_type": "cell", "location": "Archive Yard", "strength": -70, "timestamp": "2001-02-03T04:05:06"}).json()["signal"]
+    client.post(f"/api/threat?signal_id={old['signal_id']}&threat_level=low")
+    body = client.post("/api/retention/sweep").json()
+    assert body["archived"]["signals"] >= 1
+    assert client.get(f"/api/signals/{old['signal_id']}").status_code == 404
+    trends = client.get("/api/trends?start=2001-02-03T00:00:00&end=2001-02-04T00:00:00&include_locations=true").json()
+    assert trends["total_signals"] == 1 and trends["partitions"][0]["archived"] is True
+    assert trends["partitions"][0]["locations"] == {"Archive Yard": 1}
+    assert client.get("/api/trends?start=garbage").status_code == 400
+
+
+def test_failed_archive_keeps_rows_until_the_next_sweep(monkeypatch):
+    from src import main
+
+    def disk_full(*args):
+        raise OSError("No space left on device")
+
+    client = TestClient(app)
+    old = client.post("/api/signal", json={"signal_type": "ble", "location": "Cold Store", "strength": -60, "timestamp": "2002-03-04T05:06:07"}).json()["signal"]
+    monkeypatch.setattr(main.retention, "write_archive", disk_full)
+    assert client.post("/api/retention/sweep").status_code == 500
+    assert client.get(f"/api/signals/{old['signal_id']}").status_code == 200
+    hot = client.get("/api/dashboard").json()["dashboard"]["real_time_status"]["total_signals_detected"]
+    monkeypatch.undo()
+    archived = client.post("/api/retention/sweep").json()["archived"]["signals"]
+    assert archived >= 1 and client.get(f"/api/signals/{old['signal_id']}").status_code == 404
+    assert client.get("/api/dashboard").json()["dashboard"]["real_time_status"]["total_signals_detected"] == hot - archived
@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from modules.detection import SourceClusters
+from src.main import app
+
+
+def test_fingerprint_and_co_occurrence_links():
+    clusters = SourceClusters(window_ms=1000, co_occurrence_threshold=2)
+    clusters.observe("a", "wifi", "dr5reg", 0, "case-1", fingerprint="aa:bb")
+    clusters.observe("b", "wifi", "dr5ru7", 50000, "case-2", fingerprint="aa:bb")
+    assert clusters.cluster("b")["sources"] == ["a", "b"]
+    assert [c["linked_cases"] for c in clusters.cross_case()] == [["case-1", "case-2"]]
+    clusters.observe("c", "ble", "dr5ru7", 50500, "case-3")
+    assert clusters.cluster("c")["sources"] == ["c"]
+    clusters.observe("c", "ble", "dr5reg", 90000)
+    clusters.observe("b", "wifi", "dr5ru7", 50800)
+    assert clusters.cluster("c")["sources"] == ["c"]
+    clusters.observe("c", "ble", "dr5ru7", 52000)
+    clusters.observe("b", "wifi", "dr5ru7", 52100)
+    cluster = clusters.cluster("c")
+    assert cluster["sources"] == ["a", "b", "c"] and cluster["links"] == {"fingerprint": 1, "co_occurrence": 1}
+    assert cluster["linked_cases"] == ["case-1", "case-2", "case-3"] and cluster["signal_count"] == 7
+    assert len(clusters.cross_case()) == 1 and clusters.cluster("unknown") is None
+
+
+def test_pings_next_to_a_bystander_count_once_and_stale_pairs_age_out():
+    clusters = SourceClusters(window_ms=300000, co_occurrence_threshold=3, pair_ttl_ms=600000)
+    clusters.observe("bystander", "ble", "pier", 0, "case-1")
+    for ping in range(3):
+        clusters.observe("device", "ble", "pier", 1000 + ping * 1000, "case-2")
+    assert clusters.cluster("device")["sources"] == ["device"] and clusters.cross_case() == []
+    assert clusters._pairs == {("bystander", "device"): (1, 1000)}
+    clusters.observe("device", "ble", "pier", 2000000)
+    clusters.observe("bystander", "ble", "pier", 2000100)
+    assert clusters._pairs == {("bystander", "device"): (1, 2000100)}
+
+
+def test_pairs_stay_bounded_and_a_future_timestamp_does_not_stop_linking():
+    clusters = SourceClusters(window_ms=1000, co_occurrence_threshold=3, max_pairs=50)
+    clusters.observe("clock-skew", "ble", "elsewhere", 4102444800000)
+    for i in range(200):
+        clusters.observe(f"s{i}", "ble", "pier", i * 2000)
+        clusters.observe(f"t{i}", "ble", "pier", i * 2000 + 10)
+    assert len(clusters._pairs) == 50 and ("s199", "t199") in clusters._pairs
+    for window in range(3):
+        clusters.observe("a", "wifi", "dock", 10 ** 7 + window * 5000)
+        clusters.observe("b", "wifi", "dock", 10 ** 7 + window * 5000 + 10)
+    assert clusters.cluster("a")["sources"] == ["a", "b"]
+
+
+def test_source_endpoint():
+    client = TestClient(app)
+    for case_name in ("Dock A", "Dock B"):
+        case_id = client.post("/api/case", json={"title": case_name, "description": "", "investigator": "ops", "priority": "low"}).json()["case"]["case_id"]
+        client.post(f"/api/signals/bulk?case_id={case_id}", json=[{"signal_type": "wifi", "location": "Dock", "strength": -40, "source_id": f"cam-{case_name[-1]}", "fingerprint": "de:ad:be:ef"}])
+    body = client.get("/api/sources/cam-B").json()
+    assert body["cluster"]["sources"] == ["cam-A", "cam-B"] and len(body["cluster"]["linked_cases"]) == 2
+    assert any(cluster["cluster_id"] == body["cluster"]["cluster_id"] for cluster in client.get("/api/sources").json()["clusters"])
+    assert client.get("/api/sources/missing").status_code == 404
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.storage import SpatioTemporalIndex, parse_coordinates, parse_epoch_ms, to_utc
+from modules.storage.spatial_index import geohash_encode
+from src.main import app
+
+
+def test_geohash_and_coordinate_parsing():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert parse_coordinates(" 40.7128, -74.0060 ") == (40.7128, -74.006)
+    assert parse_coordinates("Warehouse 7") is None
+    assert parse_coordinates("95.0,10.0") is None
+    assert parse_epoch_ms("2026-01-01T00:00:00") == parse_epoch_ms("2026-01-01T00:00:00Z") == 1767225600000
+    assert to_utc("2026-01-01T05:30:00+05:30") == to_utc("2026-01-01T00:00:00Z") == "2026-01-01T00:00:00"
+    with pytest.raises(ValueError):
+        to_utc("garbage")
+
+
+def test_bbox_and_radius_queries_respect_time_window():
+    index = SpatioTemporalIndex(precision=5)
+    index.add("pier", 40.7000, -74.0100, 2000)
+    index.add("pier-early", 40.7001, -74.0101, 1000)
+    index.add("bridge", 40.7060, -73.9970, 3000)
+    index.add("boston", 42.3601, -71.0589, 2500)
+    assert index.search_bbox(40.69, -74.02, 40.71, -74.00) == [(1000, "pier-early"), (2000, "pier")]
+    assert index.search_bbox(40.0, -75.0, 43.0, -70.0, 1500, 2600) == [(2000, "pier"), (2500, "boston")]
+    assert [signal_id for _, signal_id in index.search_radius(40.7, -74.01, 2.0)] == ["pier-early", "pier", "bridge"]
+    assert index.search_radius(40.7, -74.01, 0.5, end_ms=1500) == [(1000, "pier-early")]
+    index.discard("pier-early")
+    assert index.search_radius(40.7, -74.01, 0.5) == [(2000, "pier")]
+
+
+def test_search_endpoint():
+    client = TestClient(app)
+    client.post("/api/signal", json={"signal_type": "cell", "location": "-33.8688,151.2093", "strength": -60, "timestamp": "2026-03-01T10:00:00"})
+    client.post("/api/signal", json={"signal_type": "ble", "location": "Harbour", "latitude": -33.8690, "longitude": 151.2100, "strength": -50, "timestamp": "2026-03-01T12:00:00"})
+    body = client.get("/api/signals/search?lat=-33.8688&lon=151.2093&radius_km=1&start=2026-03-01T09:00:00&end=2026-03-01T11:00:00").json()
+    assert [signal["signal_type"] for signal in body["signals"]] == ["cell"]
+    body = client.get("/api/signals/search?min_lat=-34&min_lon=151&max_lat=-33&max_lon=152&signal_type=ble").json()
+    assert body["total_signals"] == 1 and body["signals"][0]["location"] == "Harbour"
+    assert client.get("/api/signals/search?lat=1").status_code == 400
+    assert client.get("/api/signals/search?lat=-33.8688&lon=151.2093&radius_km=1&start=garbage").status_code == 400
+    assert client.get("/api/signals/search?lat=91&lon=0&radius_km=1").status_code == 422
+    assert client.post("/api/signal", json={"signal_type": "ble", "location": "x", "strength": -50, "latitude": 95, "longitude": 0}).status_code == 422
+    assert client.post("/api/signal", json={"signal_type": "ble", "location": "x", "strength": -50, "timestamp": "garbage"}).status_code == 422
+    bulk = client.post("/api/signals/bulk", json=[{"signal_type": "ble", "location": "x", "strength": -50, "timestamp": "garbage"}, {"signal_type": "ble", "location": "x", "strength": -50, "timestamp": "2026-03-01T13:00:00+01:00"}]).json()
+    assert bulk["rejected"] == 1 and bulk["errors"][0]["index"] == 0
+    assert client.get(f"/api/signals/{bulk['batches'][0]['first_signal_id']}").json()["signal"]["timestamp"] == "2026-03-01T12:00:00"
@@ -0,0 +1,111 @@
+import sqlite3
+
+from modules.storage import IndexedStore, SQLiteBackend
+from modules.storage.sqlite_backend import path_from_url
+
+
+def test_path_from_url():
+    assert path_from_url("sqlite:///data/fortress.db") == "data/fortress.db"
+    assert path_from_url("sqlite:////var/lib/fortress.db") == "/var/lib/fortress.db"
+    assert path_from_url("sqlite://") == ":memory:"
+    assert path_from_url("sqlite:///data/fortress.db", "/srv/app") == "/srv/app/data/fortress.db"
+    assert path_from_url("sqlite:////var/lib/fortress.db", "/srv/app") == "/var/lib/fortress.db"
+
+
+def test_store_writes_through_and_reloads(tmp_path):
+    path = str(tmp_path / "fortress.db")
+    backend = SQLiteBackend(path, batch_size=2)
+    store = IndexedStore("signal_id", indexes=("signal_type",), backend=backend, table="signals")
+    for i in range(5):
+        store[str(i)] = {"signal_id": str(i), "signal_type": "ble", "case_id": None}
+    store.update_fields("1", signal_type="wifi")
+    del store["3"]
+    backend.save("evidence", {"evidence_id": "e1", "data": {}}, case_id="c1")
+    backend.flush()
+    backend.close()
+
+    backend = SQLiteBackend(path)
+    reloaded = IndexedStore("signal_id", indexes=("signal_type",))
+    reloaded.load(record for _, record in backend.load("signals"))
+    assert list(reloaded) == ["0", "1", "2", "4"]
+    assert reloaded.count(signal_type="wifi") == 1
+    assert list(backend.load("evidence")) == [({"case_id": "c1"}, {"evidence_id": "e1", "data": {}})]
+    assert backend._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    backend.close()
+
+
+def test_shared_backends_increment_atomically_and_see_each_others_changes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = SQLiteBackend(path, shared=True), SQLiteBackend(path, shared=True)
+    cases_a = IndexedStore("case_id", indexes=("status",), backend=first, table="cases")
+    cases_b = IndexedStore("case_id", indexes=("status",), backend=second, table="cases")
+    cases_a["c1"] = {"case_id": "c1", "status": "active", "signals_tracked": 0, "evidence": []}
+    first.flush()
+    seq, changes = second.changes_since(0)
+    cases_b.load([{**record, "evidence": []} for _, _, _, record in changes])
+    for _ in range(50):
+        cases_a.increment("c1", "signals_tracked")
+        cases_b.increment("c1", "signals_tracked", 2)
+    cases_b.update_fields("c1", status="closed")
+    first.flush()
+    second.flush()
+    seq, changes = first.changes_since(0)
+    assert [(table, record_id) for table, record_id, _, _ in changes] == [("cases", "c1")]
+    assert changes[0][2] == {"status": "closed"} and changes[0][3]["signals_tracked"] == 150
+    assert first.changes_since(seq) == (seq, [])
+    assert first.try_lease("retention", "a", 60) and not second.try_lease("retention", "b", 60)
+    for backend in (first, second):
+        backend.close()
+
+
+def test_other_workers_read_committed_rows_and_bump_uncached_counters(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = SQLiteBackend(path, shared=True, linger=1.0), SQLiteBackend(path, shared=True)
+    first.save("cases", {"case_id": "c1", "status": "active", "signals_tracked": 0})
+    first.save("evidence", {"evidence_id": "e1"}, case_id="c1")
+    assert first.sync(5)
+    assert second.fetch("cases", "c1") == ({"status": "active"}, {"case_id": "c1", "status": "active", "signals_tracked": 0})
+    assert second.fetch_where("evidence", "case_id", "c1") == [({"case_id": "c1"}, {"evidence_id": "e1"})]
+    assert second.fetch("cases", "missing") is None
+    second.increment("cases", "c1", "signals_tracked", 3)
+    second.sync()
+    assert first.fetch("cases", "c1")[1]["signals_tracked"] == 3
+    for backend in (first, second):
+        backend.close()
+
+
+def test_failed_batches_are_retried_and_bad_writes_isolated(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "retry.db"), batch_size=10, linger=0.05)
+    backend.retry_delay = 0.001
+    commit, failures = backend._commit, []
+
+    def flaky_commit(ops):
+        if len(failures) < 2:
+            failures.append(len(ops))
+            raise sqlite3.OperationalError("database is locked")
+        commit(ops)
+
+    backend._commit = flaky_commit
+    backend.save("cases", {"case_id": "c1", "status": "active"})
+    backend.save("cases", {"case_id": "c2", "status": "active"})
+    backend.patch("cases", "c1", {"status": "closed"})
+    backend._queue.put(("INSERT INTO cases (case_id, status, data) VALUES (?, ?, ?)", ("c2", "dup", "{}")))
+    backend.save("cases", {"case_id": "c3", "status": "active"})
+    backend.flush()
+    assert failures == [5, 5]
+    assert [(columns["status"], record["case_id"]) for columns, record in backend.load("cases")] == [("closed", "c1"), ("active", "c2"), ("active", "c3")]
+    backend.close()
+
+
+def test_writes_are_dropped_once_retries_run_out(tmp_path, caplog):
+    backend = SQLiteBackend(str(tmp_path / "full.db"), linger=0.01)
+    backend.retry_delay, backend.max_retry_time = 0.001, 0.05
+
+    def disk_full(ops):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    backend._commit = disk_full
+    backend.save("cases", {"case_id": "c1", "status": "active"})
+    assert backend.sync(5)
+    assert any(record.exc_info and "disk is full" in str(record.exc_info[1]) for record in caplog.records if record.message.startswith("Dropped"))
+    backend.close()
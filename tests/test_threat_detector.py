@@ -1,2 +1,41 @@
+from src.threat_detector import ThreatDetector
+
+
+def make_signal(i, signal_type="ble", strength=-70, location="dock", source_id="dev-1", minute=0):
+    return {"signal_id": str(i), "signal_type": signal_type, "location": location, "strength": strength, "source_id": source_id, "timestamp": f"2026-01-01T00:{minute:02d}:00"}
+
+
 def test_threat_detector():
-    pass
+    detector = ThreatDetector()
+    quiet = [make_signal(0), make_signal(1, location="lot", source_id="dev-2")]
+    assert detector.classify(quiet) == ["low", "low"]
+    busy = [make_signal(i, signal_type=t, strength=-70 - i % 2, minute=i // 4) for i, t in enumerate(["ble", "cell", "wifi", "cell_tower"] * 5)]
+    busy.append(make_signal(99, signal_type="cell", strength=-10, minute=5))
+    scored = detector.score(busy).set_index("signal_id")
+    assert scored.loc["99", "co_occurrence"] == 4
+    assert scored.loc["99", "strength_z"] > 3
+    assert detector.classify(busy, ["99"]) == ["critical"]
+
+
+def test_ordinary_mixed_traffic_scores_low():
+    detector = ThreatDetector()
+    types = ["ble", "cell", "wifi", "cell_tower"]
+    signals = [make_signal(i, signal_type=types[i % 4], strength=-70 + (i * 7) % 11 - 5, source_id=f"dev-{i % 8}", minute=i // 2) for i in range(40)]
+    scored = detector.score(signals)
+    assert scored["co_occurrence"].max() == 4
+    assert set(scored["threat_level"]) == {"low"}
+
+
+def test_windows_are_per_location_and_time():
+    detector = ThreatDetector(window="1min")
+    signals = [make_signal(0, minute=0), make_signal(1, minute=10), make_signal(2, location="lot", minute=10)]
+    scored = detector.score(signals)
+    assert scored["burst_rate"].tolist() == [1.0, 1.0, 2.0]
+    assert scored["co_occurrence"].tolist() == [1, 1, 1]
+
+
+def test_epoch_timestamps_and_empty_batch():
+    detector = ThreatDetector()
+    signals = [dict(make_signal(i), timestamp=1767225600000 + i) for i in range(3)]
+    assert len(detector.score(signals)) == 3
+    assert detector.score([]).empty